@@ -0,0 +1,127 @@
+"""Microbenchmark for the query intent engine.
+
+Generates synthetic keyword rules, compiles them with ``main.IntentEngine`` and
+measures the per-query match cost at several rule counts. A naive matcher that
+checks every rule with substring tests is timed alongside as a baseline: its
+cost grows with the number of rules, the compiled engine's should stay flat.
+
+Usage:
+    python benchmarks/intent.py
+    python benchmarks/intent.py --rules 10 100 1000 5000 --queries 2000 --output intent_bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 9)))
+
+
+def make_rules(count: int, rng: random.Random) -> list[dict[str, object]]:
+    rules: list[dict[str, object]] = list(main.DEFAULT_INTENT_RULES)
+    for idx in range(count - len(rules)):
+        groups = [[make_word(rng) for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(1, 3))]
+        rules.append(
+            {
+                "name": f"rule-{idx}",
+                "priority": rng.randint(0, 50),
+                "all": groups,
+                "set": {"type": rng.choice(["news", "text"]), "timelimit": rng.choice(["d", "w", "m"])},
+            }
+        )
+    return rules
+
+
+def make_queries(count: int, rules: list[dict[str, object]], rng: random.Random) -> list[str]:
+    queries = []
+    for _ in range(count):
+        words = [make_word(rng) for _ in range(rng.randint(3, 8))]
+        if rng.random() < 0.3:
+            rule = rng.choice(rules)
+            words.extend(rng.choice(group) for group in rule["all"])  # type: ignore[union-attr]
+        rng.shuffle(words)
+        queries.append(" ".join(words))
+    return queries
+
+
+def naive_matcher(rules: list[dict[str, object]]) -> Callable[[str, str], object]:
+    def order(item: tuple[int, dict[str, object]]) -> tuple[int, int]:
+        return -int(item[1].get("priority", 0)), item[0]  # type: ignore[call-overload]
+
+    ordered = sorted(enumerate(rules), key=order)
+
+    def match(query: str, search_type: str) -> object:
+        text = " ".join(query.lower().split())
+        for _, rule in ordered:
+            types = rule.get("types") or []
+            if types and search_type not in types:  # type: ignore[operator]
+                continue
+            if all(any(word in text for word in group) for group in rule["all"]):  # type: ignore[union-attr]
+                return rule
+        return None
+
+    return match
+
+
+def per_query_us(match: Callable[[str, str], object], queries: list[str], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            match(query, "text")
+        samples.append((time.perf_counter() - started) / len(queries) * 1e6)
+    return statistics.median(samples)
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark intent engine duckse")
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1000], help="Jumlah rule")
+    parser.add_argument("--queries", type=int, default=1000, help="Jumlah query per pengukuran")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.rules:
+        rng = random.Random(args.seed)
+        rules = make_rules(count, rng)
+        queries = make_queries(args.queries, rules, rng)
+        started = time.perf_counter()
+        engine = main.IntentEngine(rules)
+        compile_ms = (time.perf_counter() - started) * 1000
+        engine_us = per_query_us(engine.match, queries, args.repeat)
+        naive_us = per_query_us(naive_matcher(rules), queries, args.repeat)
+        results.append(
+            {"rules": count, "compile_ms": compile_ms, "engine_us": engine_us, "naive_us": naive_us}
+        )
+        print(
+            f"rules={count:<6} compile={compile_ms:>8.2f}ms engine={engine_us:>7.2f}us/query "
+            f"naive={naive_us:>9.2f}us/query",
+            file=sys.stderr,
+        )
+
+    if args.output:
+        report = {"python": sys.version.split()[0], "queries": args.queries, "results": results}
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
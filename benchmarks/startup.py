@@ -0,0 +1,110 @@
+"""Measure cold and warm startup time of the duckse CLI.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 --output startup.json
+    python benchmarks/startup.py --binary dist/duckse/duckse
+
+"Cold" is the first run after the bytecode cache of main.py has been removed
+(or the first run of a freshly built binary); "warm" is the median of the
+runs that follow it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MOCKED_SEARCH = """
+import sys
+import main
+
+
+class FakeDDGS:
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, **kwargs):
+        return [{"title": f"{query} {idx}", "href": f"https://example.com/{idx}"} for idx in range(10)]
+
+
+main.DDGS = FakeDDGS
+sys.exit(main.run(["open source", "--json"]))
+"""
+
+
+def scenarios(binary: str | None) -> dict[str, list[str]]:
+    if binary:
+        return {
+            "help": [binary, "--help"],
+            "firecrawl_help": [binary, "firecrawl", "--help"],
+        }
+    # Import main instead of running it as a script so its bytecode cache is used,
+    # like the entry point of an installed or frozen build.
+    entry = [sys.executable, "-c", "import main; main.main()"]
+    return {
+        "help": [*entry, "--help"],
+        "firecrawl_help": [*entry, "firecrawl", "--help"],
+        "mocked_search": [sys.executable, "-c", MOCKED_SEARCH],
+    }
+
+
+def time_command(command: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def measure(command: list[str], runs: int, clear_cache: bool) -> dict[str, float]:
+    if clear_cache:
+        shutil.rmtree(ROOT / "__pycache__", ignore_errors=True)
+    cold = time_command(command)
+    warm = sorted(time_command(command) for _ in range(runs))
+    return {
+        "cold_ms": round(cold * 1000, 2),
+        "warm_p50_ms": round(statistics.median(warm) * 1000, 2),
+        "warm_min_ms": round(warm[0] * 1000, 2),
+        "warm_max_ms": round(warm[-1] * 1000, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark startup duckse")
+    parser.add_argument("--runs", type=int, default=10, help="Jumlah run warm per skenario")
+    parser.add_argument("--binary", help="Path binary hasil build (default: python main.py)")
+    parser.add_argument("--output", help="Tulis hasil JSON ke file ini")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "target": args.binary or "python -c 'import main'",
+        "runs": args.runs,
+        "results": {
+            name: measure(command, max(1, args.runs), clear_cache=not args.binary)
+            for name, command in scenarios(args.binary).items()
+        },
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + os.linesep)
+    print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
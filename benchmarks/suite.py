@@ -0,0 +1,269 @@
+"""Offline benchmark suite for duckse.
+
+Starts local stand-ins for the Firecrawl API and for redirecting URLs, swaps
+DDGS for a fake client, then measures latency (p50/p99) and throughput of the
+main code paths at several result counts.
+
+Usage:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --counts 10 50 --repeat 5 --latency-ms 20 --error-rate 0.05
+    python benchmarks/suite.py --output bench_results.json --scenario run --scenario expand_url
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+CRAWL_PAGE_SIZE = 10
+
+
+class StandInConfig:
+    def __init__(self, latency: float, error_rate: float, payload_bytes: int, seed: int) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.crawls: dict[str, int] = {}
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+def make_handler(config: StandInConfig) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload: dict | None = None, headers: dict[str, str] | None = None) -> None:
+            data = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length)) if length else {}
+
+        def _dispatch(self) -> None:
+            body = self._body()
+            time.sleep(config.latency)
+            parsed = urlparse(self.path)
+            path = parsed.path
+
+            if path.startswith("/r/"):
+                self._send(302, headers={"Location": f"/final/{path.removeprefix('/r/')}"})
+                return
+            if path.startswith("/final/"):
+                self._send(200, {})
+                return
+
+            if config.should_fail():
+                self._send(500, {"success": False, "error": "stand-in failure"})
+                return
+
+            if path == "/v1/scrape":
+                markdown = "x" * config.payload_bytes
+                self._send(200, {"success": True, "data": {"markdown": markdown, "metadata": {"sourceURL": body["url"]}}})
+            elif path == "/v1/search":
+                data = [{"title": f"r{idx}", "url": f"https://example.com/{idx}"} for idx in range(body["limit"])]
+                self._send(200, {"success": True, "data": data})
+            elif path == "/v1/crawl":
+                with config.lock:
+                    job_id = f"bench-{len(config.crawls)}"
+                    config.crawls[job_id] = int(body.get("limit", 10))
+                self._send(200, {"success": True, "id": job_id})
+            elif path.startswith("/v1/crawl/"):
+                job_id = path.removeprefix("/v1/crawl/")
+                total = config.crawls[job_id]
+                skip = int(parse_qs(parsed.query).get("skip", ["0"])[0])
+                chunk = range(skip, min(total, skip + CRAWL_PAGE_SIZE))
+                status = {
+                    "status": "completed",
+                    "total": total,
+                    "completed": total,
+                    "data": [{"markdown": "x" * config.payload_bytes, "metadata": {"sourceURL": f"/p/{idx}"}} for idx in chunk],
+                }
+                if chunk and chunk.stop < total:
+                    status["next"] = f"{os.environ['FIRECRAWL_API_URL']}/crawl/{job_id}?skip={chunk.stop}"
+                self._send(200, status)
+            else:
+                self._send(404, {"error": "unknown route"})
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+        do_HEAD = _dispatch
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            pass
+
+    return Handler
+
+
+class FakeDDGS:
+    base_url = ""
+    result_count = 10
+
+    def __init__(self, **kwargs: object) -> None:
+        pass
+
+    def __enter__(self) -> FakeDDGS:
+        return self
+
+    def __exit__(self, *exc: object) -> bool:
+        return False
+
+    def _results(self, query: str) -> list[dict[str, str]]:
+        return [
+            {"title": f"{query} {idx}", "href": f"{self.base_url}/r/{idx}", "body": f"snippet {idx}"}
+            for idx in range(self.result_count)
+        ]
+
+    def text(self, query: str, **kwargs: object) -> list[dict[str, str]]:
+        return self._results(query)
+
+    news = text
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(fn: Callable[[], int], repeat: int, items: int) -> dict[str, float]:
+    durations: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            fn()
+        durations.append(time.perf_counter() - started)
+    total = sum(durations)
+    return {
+        "repeat": repeat,
+        "p50_ms": round(statistics.median(durations) * 1000, 2),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 2),
+        "ops_per_second": round(repeat / total, 2) if total else 0.0,
+        "items_per_second": round(repeat * items / total, 2) if total else 0.0,
+    }
+
+
+def scenarios(base_url: str, count: int) -> dict[str, Callable[[], int]]:
+    def run_search() -> int:
+        return main.run(["bench query", "--output", "json", "--max-results", str(count)])
+
+    def expand_urls() -> int:
+        results = [{"url": f"{base_url}/r/{idx}"} for idx in range(count)]
+        main.with_resolved_urls(results)
+        return 0
+
+    def search_scrape() -> int:
+        return main.run_firecrawl(
+            ["search-scrape", "bench query", "--max-results", str(count), "--scrape-limit", str(count)]
+        )
+
+    def crawl_wait() -> int:
+        return main.run_firecrawl(["crawl", f"{base_url}/site", "--wait", "--max-pages", str(count), "--jsonl"])
+
+    return {
+        "run": run_search,
+        "expand_url": expand_urls,
+        "search_scrape": search_scrape,
+        "crawl_wait": crawl_wait,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline duckse")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50], help="Jumlah hasil per skenario")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Latency tiap respons stand-in")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraksi respons Firecrawl yang gagal (500)")
+    parser.add_argument("--payload-bytes", type=int, default=20_000, help="Ukuran markdown per halaman")
+    parser.add_argument("--scenario", action="append", help="Batasi ke skenario tertentu (boleh berulang)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms / 1000, args.error_rate, args.payload_bytes, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    os.environ.update(
+        {
+            "FIRECRAWL_API_URL": f"{base_url}/v1",
+            "FIRECRAWL_API_KEY": "fc-bench",
+            "DUCKSE_CACHE_DIR": tempfile.mkdtemp(prefix="duckse-bench-"),
+        }
+    )
+    os.environ.pop("DUCKSE_CACHE", None)
+    main.DDGS = FakeDDGS
+    FakeDDGS.base_url = base_url
+
+    results: list[dict[str, object]] = []
+    try:
+        for count in args.counts:
+            FakeDDGS.result_count = count
+            for name, fn in scenarios(base_url, count).items():
+                if args.scenario and name not in args.scenario:
+                    continue
+                stats = measure(fn, max(1, args.repeat), count)
+                results.append({"scenario": name, "count": count, **stats})
+                print(f"{name:<14} n={count:<4} p50={stats['p50_ms']:>9.2f}ms p99={stats['p99_ms']:>9.2f}ms", file=sys.stderr)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "config": {
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "payload_bytes": args.payload_bytes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
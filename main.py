@@ -1,19 +1,63 @@
+from __future__ import annotations
+
 import argparse
+import functools
+import gzip
+import hashlib
 import json
+import math
 import os
+import random
 import re
+import stat
 import sys
+import threading
 import time
-from collections.abc import Callable
-from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlparse
-from urllib.request import Request, urlopen
+import weakref
+import zlib
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import TYPE_CHECKING, Any, TextIO, TypeVar
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse, urlsplit, urlunsplit
+
+# ddgs, http.client, urllib.request, sqlite3 and concurrent.futures are imported
+# where they are used so that `--help` and `firecrawl` commands start quickly.
+if TYPE_CHECKING:
+    import http.client
+    from concurrent.futures import Future
+
+    from ddgs import DDGS
+
+
+def _ddgs_class() -> type[DDGS]:
+    cls = globals().get("DDGS")
+    if cls is None:
+        from ddgs import DDGS as cls
+
+        globals()["DDGS"] = cls
+    return cls
+
+
+def __getattr__(name: str) -> Any:
+    if name == "DDGS":
+        return _ddgs_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from ddgs import DDGS
+
+@functools.cache
+def _orjson() -> Any | None:
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional speedup
+        return None
+    return orjson
 
 
 SearchFn = Callable[..., list[dict[str, Any]]]
+T = TypeVar("T")
 FirecrawlRunFn = Callable[[list[str]], int]
 SEARCH_BACKENDS: dict[str, set[str]] = {
     "text": {
@@ -39,18 +83,337 @@ TIMELIMIT_BY_TYPE: dict[str, set[str]] = {
     "videos": {"d", "w", "m"},
     "news": {"d", "w", "m"},
 }
+EXPAND_MAX_WORKERS = 8
+EXPAND_PER_HOST = 2
+EXPAND_BUDGET_SECONDS = 15.0
+ASYNC_MAX_REDIRECTS = 10
+SEARCH_CACHE_TTL_BY_TYPE: dict[str, int] = {
+    "text": 6 * 3600,
+    "images": 24 * 3600,
+    "videos": 24 * 3600,
+    "news": 30 * 60,
+    "books": 3 * 24 * 3600,
+}
+SEARCH_CACHE_TTL_BY_TIMELIMIT: dict[str, int] = {
+    "d": 10 * 60,
+    "w": 3600,
+    "m": 6 * 3600,
+    "y": 24 * 3600,
+}
+SEARCH_CACHE_MAX_BYTES = 50 * 1024 * 1024
+REDIRECT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+REDIRECT_NEGATIVE_TTL_SECONDS = 3600
+NON_REDIRECT_HOST_MIN_CHECKS = 5
+SCRAPE_CACHE_TTL_SECONDS = 24 * 3600
+SCRAPE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+LOCAL_INDEX_RETENTION_SECONDS = 90 * 24 * 3600
+LOCAL_INDEX_MAX_PAGES = 100_000
+SCRAPE_CONCURRENCY = 4
+SCRAPE_BATCH_THRESHOLD = 10
+BATCH_CONCURRENCY = 4
+FIRECRAWL_BASE_URL = "https://api.firecrawl.dev/v1"
+FIRECRAWL_MAX_IDLE_CONNECTIONS = 8
+RRF_K = 60
+SIMHASH_BITS = 64
+SIMHASH_THRESHOLD = 14
+RATE_LIMIT_DEFAULTS: dict[str, tuple[float, float]] = {
+    "firecrawl": (5.0, 10.0),
+    "ddgs": (1.0, 3.0),
+}
+RATE_LIMIT_MAX_RETRIES = 4
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+RATE_LIMIT_MAX_BACKOFF_SECONDS = 30.0
+RETRY_AFTER_MAX_SECONDS = 120.0
+BACKEND_STATS_WINDOW_SECONDS = 7 * 24 * 3600
+BACKEND_STATS_SAMPLE = 200
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 300.0
+BREAKER_MAX_COOLDOWN_SECONDS = 3600.0
+ADAPTIVE_BACKEND_WIDTH = 3
+SEARCH_PREFETCH_PAGES = 1
+SEARCH_MAX_PAGES = 50
+TRACKING_QUERY_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "msclkid", "ref", "ref_src"}
+INTENT_RULE_FIELDS = ("query", "type", "region", "timelimit")
+DEFAULT_INTENT_RULES: list[dict[str, Any]] = [
+    {
+        "name": "berita-indonesia-hari-ini",
+        "priority": 100,
+        "types": ["text"],
+        "all": [["indonesia"], ["berita"], ["hari ini", "today"]],
+        "set": {"query": "berita indonesia", "type": "news", "region": "id-id", "timelimit": "d"},
+    },
+]
+WATCH_INTERVAL_SECONDS = 300.0
+WATCH_SEEN_CAPACITY = 100_000
+WATCH_SEEN_ERROR_RATE = 0.001
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+SERVE_MAX_BODY_BYTES = 1024 * 1024
+SEARCH_DEFAULTS: dict[str, Any] = {
+    "search_type": "text",
+    "region": "us-en",
+    "safesearch": "moderate",
+    "timelimit": None,
+    "max_results": 10,
+    "backend": "auto",
+}
+FIRECRAWL_TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+CRAWL_POLL_SECONDS = 2.0
+CRAWL_MAX_POLL_SECONDS = 30.0
+BATCH_QUERY_OPTIONS = {
+    "search_type",
+    "region",
+    "safesearch",
+    "timelimit",
+    "max_results",
+    "page",
+    "backend",
+    "size",
+    "color",
+    "type_image",
+    "layout",
+    "license_image",
+    "resolution",
+    "duration",
+    "license_videos",
+}
+
+
+class Tracer:
+    def __init__(self, origin: float | None = None) -> None:
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans: list[dict[str, Any]] = []
+        self._threads: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float, args: dict[str, Any]) -> None:
+        with self._lock:
+            tid = self._threads.setdefault(threading.get_ident(), len(self._threads) + 1)
+            self.spans.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((start - self.origin) * 1e6, 1),
+                    "dur": round((end - start) * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, start, time.perf_counter(), args)
+
+    def summary(self) -> str:
+        totals: dict[str, list[float]] = {}
+        for span in sorted(self.spans, key=lambda item: item["ts"]):
+            entry = totals.setdefault(span["name"], [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += span["dur"] / 1000
+            entry[2] = max(entry[2], span["dur"] / 1000)
+        elapsed = (time.perf_counter() - self.origin) * 1000
+        lines = [f"timings: total {elapsed:.1f} ms"]
+        for name, (count, total, longest) in totals.items():
+            lines.append(f"  {name:<24} {int(count):>4}x {total:>10.1f} ms  max {longest:.1f} ms")
+        return "\n".join(lines)
+
+    def write(self, path: str | Path) -> None:
+        with self._lock:
+            events = list(self.spans)
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+_tracer: Tracer | None = None
+
+
+def trace_span(name: str, **args: Any) -> Any:
+    # Without an active tracer the span is a no-op that still hands back a dict for sizes.
+    if _tracer is None:
+        return nullcontext(args)
+    return _tracer.span(name, **args)
+
+
+@contextmanager
+def tracing(*, timings: bool, trace_file: str | None, origin: float | None = None) -> Iterator[None]:
+    global _tracer
+    if not timings and not trace_file:
+        yield
+        return
+    _tracer = tracer = Tracer(origin)
+    if origin is not None:
+        tracer.record("parse_args", origin, time.perf_counter(), {})
+    try:
+        yield
+    finally:
+        _tracer = None
+        if trace_file:
+            tracer.write(trace_file)
+        if timings:
+            print(tracer.summary(), file=sys.stderr)
+
+
+def _add_trace_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--timings", action="store_true", help="Cetak ringkasan waktu tiap fase ke stderr")
+    parser.add_argument("--trace-file", help="Tulis span waktu ke file JSON format Chrome trace")
+
+
+def _normalize_intent_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _compile_intent_rule(rule: Any, order: int) -> dict[str, Any]:
+    if not isinstance(rule, dict) or not isinstance(rule.get("name"), str) or not rule["name"]:
+        raise ValueError(f"Intent rule #{order + 1} harus object dengan 'name'")
+    name = rule["name"]
+    groups = rule.get("all")
+    if (
+        not isinstance(groups, list)
+        or not groups
+        or not all(isinstance(group, list) and group for group in groups)
+        or not all(isinstance(word, str) and word.strip() for group in groups for word in group)
+    ):
+        raise ValueError(f"Intent rule '{name}': 'all' harus list berisi list kata kunci")
+    changes = rule.get("set")
+    if not isinstance(changes, dict) or not changes or set(changes) - set(INTENT_RULE_FIELDS):
+        raise ValueError(f"Intent rule '{name}': 'set' hanya boleh berisi {', '.join(INTENT_RULE_FIELDS)}")
+    if "type" in changes and changes["type"] not in SEARCH_BACKENDS:
+        raise ValueError(f"Intent rule '{name}': type '{changes['type']}' tidak valid")
+    types = rule.get("types") or []
+    if not isinstance(types, list) or set(types) - set(SEARCH_BACKENDS):
+        raise ValueError(f"Intent rule '{name}': 'types' tidak valid")
+    priority = rule.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ValueError(f"Intent rule '{name}': 'priority' harus integer")
+    return {
+        "name": name,
+        "priority": priority,
+        "order": order,
+        "types": frozenset(types),
+        "groups": [sorted({_normalize_intent_text(word) for word in group}) for group in groups],
+        "set": dict(changes),
+    }
+
+
+# A rule fires when every group in "all" has a keyword inside the normalized query; all keywords share
+# one Aho-Corasick automaton. The highest priority wins, ties go to the rule listed first.
+class IntentEngine:
+    def __init__(self, rules: Iterable[dict[str, Any]]) -> None:
+        compiled = [_compile_intent_rule(rule, order) for order, rule in enumerate(rules)]
+        self.rules = sorted(compiled, key=lambda rule: (-rule["priority"], rule["order"]))
+        keyword_ids: dict[str, int] = {}
+        self._targets: list[list[tuple[int, int]]] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        for rule_idx, rule in enumerate(self.rules):
+            for group_idx, group in enumerate(rule["groups"]):
+                for word in group:
+                    keyword = keyword_ids.get(word)
+                    if keyword is None:
+                        keyword = keyword_ids[word] = len(self._targets)
+                        self._targets.append([])
+                        self._insert(word, keyword)
+                    self._targets[keyword].append((rule_idx, group_idx))
+        self._link()
+
+    def _insert(self, word: str, keyword: int) -> None:
+        node = 0
+        for char in word:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = self._goto[node][char] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = child
+        self._out[node] += (keyword,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def match(self, query: str, search_type: str) -> dict[str, Any] | None:
+        goto, fail, out, targets = self._goto, self._fail, self._out, self._targets
+        hits: dict[int, set[int]] = {}
+        node = 0
+        for char in _normalize_intent_text(query):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in out[node]:
+                for rule_idx, group_idx in targets[keyword]:
+                    hits.setdefault(rule_idx, set()).add(group_idx)
+        for rule_idx in sorted(hits):
+            rule = self.rules[rule_idx]
+            if len(hits[rule_idx]) < len(rule["groups"]):
+                continue
+            if not rule["types"] or search_type in rule["types"]:
+                return rule
+        return None
+
+
+def load_intent_rules(path: str | Path) -> list[dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            config = json.load(handle)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Gagal membaca intent rules {path}: {exc}") from exc
+    if isinstance(config, list):
+        config = {"rules": config}
+    if not isinstance(config, dict) or not isinstance(config.get("rules", []), list):
+        raise ValueError(f"Intent rules {path} harus list atau object dengan key 'rules'")
+    rules = {rule["name"]: rule for rule in DEFAULT_INTENT_RULES} if config.get("defaults", True) else {}
+    for rule in config.get("rules", []):
+        rules[rule.get("name") if isinstance(rule, dict) else None] = rule
+    return list(rules.values())
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_intent_engine(path: str | None, mtime: float | None) -> IntentEngine:
+    return IntentEngine(DEFAULT_INTENT_RULES if path is None else load_intent_rules(path))
+
+
+def intent_engine() -> IntentEngine:
+    path = os.environ.get("DUCKSE_INTENT_RULES", "").strip() or None
+    try:
+        mtime = os.stat(path).st_mtime if path else None
+    except OSError as exc:
+        raise ValueError(f"Gagal membaca intent rules {path}: {exc}") from exc
+    return _cached_intent_engine(path, mtime)
+
+
+def explain_query_defaults(
+    *, query: str, search_type: str, region: str, timelimit: str | None
+) -> dict[str, Any]:
+    rule = intent_engine().match(query, search_type)
+    changes = rule["set"] if rule is not None else {}
+    return {
+        "rule": rule["name"] if rule is not None else None,
+        "query": changes.get("query", query),
+        "type": changes.get("type", search_type),
+        "region": changes.get("region", region),
+        "timelimit": changes.get("timelimit", timelimit),
+    }
 
 
 def prepare_query_defaults(
     *, query: str, search_type: str, region: str, timelimit: str | None
 ) -> tuple[str, str, str, str | None]:
-    normalized = re.sub(r"\s+", " ", query.lower()).strip()
-    if search_type == "text" and "indonesia" in normalized:
-        has_berita = "berita" in normalized or "beritakan" in normalized
-        has_today = "hari ini" in normalized or "today" in normalized
-        if has_berita and has_today:
-            return "berita indonesia", "news", "id-id", "d"
-    return query, search_type, region, timelimit
+    intent = explain_query_defaults(query=query, search_type=search_type, region=region, timelimit=timelimit)
+    return intent["query"], intent["type"], intent["region"], intent["timelimit"]
 
 
 def get_result_url(item: dict[str, Any]) -> str | None:
@@ -61,33 +424,213 @@ def get_result_url(item: dict[str, Any]) -> str | None:
     return None
 
 
+@functools.cache
+def _redirect_opener() -> Any:
+    from urllib.request import HTTPRedirectHandler, build_opener
+
+    class KeepMethodRedirectHandler(HTTPRedirectHandler):
+        def redirect_request(self, req, fp, code, msg, headers, newurl):  # type: ignore[no-untyped-def]
+            new_request = super().redirect_request(req, fp, code, msg, headers, newurl)
+            if new_request is not None and req.get_method() == "HEAD":
+                new_request.method = "HEAD"
+            return new_request
+
+    return build_opener(KeepMethodRedirectHandler)
+
+
+def _final_url(url: str, method: str, timeout: float) -> str:
+    from urllib.request import Request
+
+    request = Request(url, method=method, headers={"User-Agent": "duckse/1.0"})
+    # Only the status line and headers are read; the body is never consumed.
+    with _redirect_opener().open(request, timeout=timeout) as response:  # noqa: S310
+        return response.geturl()
+
+
 def resolve_url(url: str, timeout: int = 6) -> str | None:
-    try:
-        request = Request(url, method="GET", headers={"User-Agent": "duckse/1.0"})
-        with urlopen(request, timeout=timeout) as response:  # noqa: S310
-            final_url = response.geturl()
-    except (URLError, ValueError):
-        return None
+    from urllib.error import HTTPError, URLError
+
+    with trace_span("resolve_url", url=url) as span:
+        try:
+            try:
+                final_url = _final_url(url, "HEAD", timeout)
+            except HTTPError:
+                final_url = _final_url(url, "GET", timeout)
+        except (URLError, ValueError, OSError):
+            span["resolved"] = False
+            return None
+        span["resolved"] = True
+
+    return _absolute_url(final_url)
 
-    parsed = urlparse(final_url)
+
+def _absolute_url(url: str) -> str | None:
+    parsed = urlparse(url)
     if parsed.scheme and parsed.netloc:
-        return final_url
+        return url
     return None
 
 
-def with_resolved_urls(
-    results: list[dict[str, Any]], resolver: Callable[[str], str | None] = resolve_url
-) -> list[dict[str, Any]]:
-    output: list[dict[str, Any]] = []
-    for item in results:
-        record = dict(item)
-        url = get_result_url(record)
-        if url:
-            resolved = resolver(url)
+class _UrlResolutionJob:
+    def __init__(
+        self,
+        urls: list[str],
+        resolver: Callable[[str], str | None],
+        *,
+        max_workers: int,
+        per_host: int,
+        budget: float,
+    ) -> None:
+        self._pending = list(dict.fromkeys(urls))
+        self._resolver = resolver
+        self._deadline = time.monotonic() + budget
+        self._host_slots = {
+            urlparse(url).netloc.lower(): threading.BoundedSemaphore(max(1, per_host))
+            for url in self._pending
+        }
+        self._queue: SimpleQueue[str] = SimpleQueue()
+        for url in self._pending:
+            self._queue.put(url)
+        self._resolved: dict[str, str | None] = {}
+        self._cond = threading.Condition()
+
+        # Daemon workers so that a host hanging past the budget never delays exit.
+        for _ in range(min(max(1, max_workers), len(self._pending))):
+            threading.Thread(target=self._work, name="duckse-expand", daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            try:
+                url = self._queue.get_nowait()
+            except Empty:
+                return
+            result: str | None = None
+            attempted = False
+            slot = self._host_slots[urlparse(url).netloc.lower()]
+            remaining = self._deadline - time.monotonic()
+            if remaining > 0 and slot.acquire(timeout=remaining):
+                try:
+                    if time.monotonic() < self._deadline:
+                        attempted = True
+                        result = self._resolver(url)
+                except Exception:  # noqa: BLE001
+                    result = None
+                finally:
+                    slot.release()
+            if not attempted:
+                continue
+            with self._cond:
+                self._resolved[url] = result
+                self._cond.notify_all()
+
+    def _remaining(self) -> float:
+        return max(0.0, self._deadline - time.monotonic())
+
+    def get(self, url: str) -> str | None:
+        with self._cond:
+            self._cond.wait_for(lambda: url in self._resolved, timeout=self._remaining())
+            return self._resolved.get(url)
+
+    def results(self) -> dict[str, str | None]:
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._resolved) == len(self._pending), timeout=self._remaining())
+            return dict(self._resolved)
+
+    def snapshot(self) -> dict[str, str | None]:
+        with self._cond:
+            return dict(self._resolved)
+
+
+def resolve_urls(
+    urls: list[str],
+    resolver: Callable[[str], str | None] = resolve_url,
+    *,
+    max_workers: int = EXPAND_MAX_WORKERS,
+    per_host: int = EXPAND_PER_HOST,
+    budget: float = EXPAND_BUDGET_SECONDS,
+    cache: RedirectCache | None = None,
+) -> dict[str, str | None]:
+    known = cache.lookup_many(urls) if cache is not None else {}
+    misses = [url for url in urls if url not in known]
+    if not misses:
+        return known
+    job = _UrlResolutionJob(misses, resolver, max_workers=max_workers, per_host=per_host, budget=budget)
+    resolved = job.results()
+    if cache is not None:
+        cache.store_many(resolved)
+    return {**known, **resolved}
+
+
+def iter_resolved_urls(
+    results: list[dict[str, Any]],
+    resolver: Callable[[str], str | None] = resolve_url,
+    *,
+    max_workers: int = EXPAND_MAX_WORKERS,
+    per_host: int = EXPAND_PER_HOST,
+    budget: float = EXPAND_BUDGET_SECONDS,
+    cache: RedirectCache | None = None,
+) -> Iterator[dict[str, Any]]:
+    records = [dict(item) for item in results]
+    urls = [url for url in (get_result_url(record) for record in records) if url]
+    known = cache.lookup_many(urls) if cache is not None else {}
+    misses = [url for url in urls if url not in known]
+    job = _UrlResolutionJob(misses, resolver, max_workers=max_workers, per_host=per_host, budget=budget)
+    try:
+        for record in records:
+            url = get_result_url(record)
+            if url in known:
+                resolved = known[url]
+            else:
+                resolved = job.get(url) if url else None
             if resolved and resolved != url:
                 record["resolved_url"] = resolved
-        output.append(record)
-    return output
+            yield record
+    finally:
+        if cache is not None:
+            cache.store_many(job.snapshot())
+
+
+def with_resolved_urls(
+    results: list[dict[str, Any]],
+    resolver: Callable[[str], str | None] = resolve_url,
+    *,
+    max_workers: int = EXPAND_MAX_WORKERS,
+    per_host: int = EXPAND_PER_HOST,
+    budget: float = EXPAND_BUDGET_SECONDS,
+    cache: RedirectCache | None = None,
+) -> list[dict[str, Any]]:
+    return list(
+        iter_resolved_urls(
+            results,
+            resolver,
+            max_workers=max_workers,
+            per_host=per_host,
+            budget=budget,
+            cache=cache,
+        )
+    )
+
+
+def dumps_json(value: Any, *, indent: bool = False) -> str:
+    if indent:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    orjson = _orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_jsonl(records: Iterable[dict[str, Any]], stream: TextIO | None = None) -> int:
+    out = stream if stream is not None else sys.stdout
+    count = 0
+    for record in records:
+        out.write(dumps_json(record) + "\n")
+        out.flush()
+        count += 1
+    return count
 
 
 def render_pretty(results: list[dict[str, Any]], search_type: str) -> str:
@@ -160,131 +703,2302 @@ def search(
     proxy: str | None = None,
     timeout: int = 5,
     verify: bool | str = True,
+    client: Any | None = None,
 ) -> list[dict[str, Any]]:
     validate_search_options(search_type=search_type, timelimit=timelimit, backend=backend)
 
-    with DDGS(proxy=proxy, timeout=timeout, verify=verify) as ddgs:
-        if search_type == "text":
-            return ddgs.text(
-                query,
-                region=region,
-                safesearch=safesearch,
-                timelimit=timelimit,
-                max_results=max_results,
-                page=page,
-                backend=backend,
-            )
+    def search_once() -> list[dict[str, Any]]:
+        session = (
+            nullcontext(client)
+            if client is not None
+            else _ddgs_class()(proxy=proxy, timeout=timeout, verify=verify)
+        )
+        with session as ddgs, trace_span("ddgs", search_type=search_type, backend=backend):
+            if search_type == "text":
+                return ddgs.text(
+                    query,
+                    region=region,
+                    safesearch=safesearch,
+                    timelimit=timelimit,
+                    max_results=max_results,
+                    page=page,
+                    backend=backend,
+                )
+
+            if search_type == "images":
+                return ddgs.images(
+                    query,
+                    region=region,
+                    safesearch=safesearch,
+                    timelimit=timelimit,
+                    max_results=max_results,
+                    page=page,
+                    backend=backend,
+                    size=size,
+                    color=color,
+                    type_image=type_image,
+                    layout=layout,
+                    license_image=license_image,
+                )
+
+            if search_type == "videos":
+                return ddgs.videos(
+                    query,
+                    region=region,
+                    safesearch=safesearch,
+                    timelimit=timelimit,
+                    max_results=max_results,
+                    page=page,
+                    backend=backend,
+                    resolution=resolution,
+                    duration=duration,
+                    license_videos=license_videos,
+                )
+
+            if search_type == "news":
+                return ddgs.news(
+                    query,
+                    region=region,
+                    safesearch=safesearch,
+                    timelimit=timelimit,
+                    max_results=max_results,
+                    page=page,
+                    backend=backend,
+                )
+
+            if search_type == "books":
+                return ddgs.books(
+                    query,
+                    max_results=max_results,
+                    page=page,
+                    backend=backend,
+                )
+
+        raise ValueError(f"Unsupported search type: {search_type}")
+
+    if rate_limiter() is None:
+        # Without shared limits a rate-limited backend fails at once, so the circuit breaker and
+        # fan-out legs above learn about it immediately instead of after several backoff sleeps.
+        return search_once()
+    return call_with_rate_limit(f"ddgs:{backend}", search_once, is_rate_limited=_search_retryable)
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in {80, 443}:
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_QUERY_PARAMS
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _result_key(item: dict[str, Any]) -> str | None:
+    url = get_result_url(item) or item.get("image")
+    if isinstance(url, str) and url:
+        return normalize_url(url)
+    title = item.get("title")
+    if isinstance(title, str) and title.strip():
+        return "title:" + " ".join(title.lower().split())
+    return None
+
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> int:
+    words = re.findall(r"\w+", text.lower())
+    features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    weights = [0] * bits
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=bits // 8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def cluster_near_duplicates(
+    results: list[dict[str, Any]], threshold: int = SIMHASH_THRESHOLD
+) -> list[list[dict[str, Any]]]:
+    clusters: list[list[dict[str, Any]]] = []
+    fingerprints: list[int] = []
+    for item in results:
+        text = f"{item.get('title') or ''} {item.get('body') or item.get('description') or ''}"
+        fingerprint = simhash(text)
+        for idx, representative in enumerate(fingerprints):
+            if (fingerprint ^ representative).bit_count() <= threshold:
+                clusters[idx].append(item)
+                break
+        else:
+            clusters.append([item])
+            fingerprints.append(fingerprint)
+    return clusters
+
+
+def rrf_merge(rankings: dict[str, list[dict[str, Any]]], k: int = RRF_K) -> list[dict[str, Any]]:
+    scores: dict[str, float] = {}
+    best_rank: dict[str, int] = {}
+    merged: dict[str, dict[str, Any]] = {}
+    for backend, results in rankings.items():
+        for rank, item in enumerate(results, start=1):
+            key = _result_key(item) or f"{backend}:{rank}"
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in merged or rank < best_rank[key]:
+                backends = merged[key]["backends"] if key in merged else []
+                merged[key] = {**item, "backends": backends}
+                best_rank[key] = rank
+            if backend not in merged[key]["backends"]:
+                merged[key]["backends"].append(backend)
+    order = sorted(merged, key=lambda key: (-scores[key], best_rank[key]))
+    return [merged[key] for key in order]
+
+
+def fanout_search(
+    search_fn: SearchFn,
+    *,
+    first_n: int | None = None,
+    k: int = RRF_K,
+    on_abandon: Callable[[str, float], None] | None = None,
+) -> SearchFn:
+    def wrapper(**kwargs: Any) -> list[dict[str, Any]]:
+        search_type = kwargs.get("search_type", "text")
+        requested = [item.strip() for item in str(kwargs.get("backend", "auto")).split(",") if item.strip()]
+        if "auto" in requested:
+            requested = sorted(SEARCH_BACKENDS.get(search_type, {"auto"}) - {"auto"}) or ["auto"]
+        backends = list(dict.fromkeys(requested))
+        validate_search_options(
+            search_type=search_type,
+            timelimit=kwargs.get("timelimit"),
+            backend=",".join(backends),
+        )
+        if len(backends) == 1:
+            return search_fn(**{**kwargs, "backend": backends[0]})
+
+        outcomes: SimpleQueue[tuple[str, list[dict[str, Any]] | None, Exception | None]] = SimpleQueue()
+
+        def query_backend(backend: str) -> None:
+            try:
+                outcomes.put((backend, search_fn(**{**kwargs, "backend": backend}), None))
+            except Exception as exc:  # noqa: BLE001
+                outcomes.put((backend, None, exc))
+
+        # Daemon threads: with first_n, slower backends are abandoned instead of awaited.
+        started = time.monotonic()
+        for backend in backends:
+            threading.Thread(target=query_backend, args=(backend,), name="duckse-fanout", daemon=True).start()
+
+        rankings: dict[str, list[dict[str, Any]]] = {}
+        errors: list[Exception] = []
+        pending = set(backends)
+        for _ in backends:
+            backend, results, error = outcomes.get()
+            pending.discard(backend)
+            if error is not None:
+                errors.append(error)
+                continue
+            rankings[backend] = results or []
+            unique = {_result_key(item) for items in rankings.values() for item in items}
+            if first_n and len(unique) >= first_n:
+                break
+
+        if on_abandon is not None:
+            elapsed = time.monotonic() - started
+            for backend in sorted(pending):
+                on_abandon(backend, elapsed)
+        if not rankings and errors:
+            raise errors[-1]
+        merged = rrf_merge({backend: rankings[backend] for backend in backends if backend in rankings}, k=k)
+        max_results = kwargs.get("max_results")
+        return merged[:max_results] if max_results else merged
+
+    return wrapper
+
+
+class _SearchPagePrefetcher:
+    def __init__(self, search_fn: SearchFn, kwargs: dict[str, Any], *, prefetch: int, max_pages: int) -> None:
+        self._search_fn = search_fn
+        self._kwargs = kwargs
+        self._prefetch = max(1, prefetch)
+        self._max_pages = max_pages
+        self._pages: deque[tuple[list[dict[str, Any]], Exception | None]] = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+        threading.Thread(target=self._work, name="duckse-pages", daemon=True).start()
+
+    def _work(self) -> None:
+        try:
+            self._fetch_pages()
+        except Exception as exc:  # noqa: BLE001
+            # Session setup failed (bad proxy or verify, ddgs missing): hand the error to next_page().
+            with self._cond:
+                self._pages.append(([], exc))
+                self._cond.notify_all()
+
+    def _fetch_pages(self) -> None:
+        kwargs = self._kwargs
+        session: Any = nullcontext(kwargs.get("client"))
+        if self._search_fn is search and kwargs.get("client") is None:
+            # One DDGS session for every page instead of a new one per request.
+            session = _ddgs_class()(
+                proxy=kwargs.get("proxy"), timeout=kwargs.get("timeout", 5), verify=kwargs.get("verify", True)
+            )
+        first_page = int(kwargs.get("page") or 1)
+        with session as client:
+            if client is not None:
+                kwargs = {**kwargs, "client": client}
+            for page in range(first_page, first_page + self._max_pages):
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed or len(self._pages) < self._prefetch)
+                    if self._closed:
+                        return
+                try:
+                    outcome: tuple[list[dict[str, Any]], Exception | None] = (
+                        self._search_fn(**{**kwargs, "page": page}) or [],
+                        None,
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    outcome = ([], exc)
+                with self._cond:
+                    self._pages.append(outcome)
+                    self._cond.notify_all()
+                if not outcome[0]:
+                    return
+        with self._cond:
+            self._pages.append(([], None))
+            self._cond.notify_all()
+
+    def next_page(self) -> tuple[list[dict[str, Any]], Exception | None]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._pages)
+            outcome = self._pages.popleft()
+            self._cond.notify_all()
+            return outcome
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def iter_search(
+    *,
+    search_fn: SearchFn = search,
+    limit: int | None = None,
+    prefetch: int = SEARCH_PREFETCH_PAGES,
+    max_pages: int = SEARCH_MAX_PAGES,
+    **kwargs: Any,
+) -> Iterator[dict[str, Any]]:
+    validate_search_options(
+        search_type=kwargs.get("search_type", "text"),
+        timelimit=kwargs.get("timelimit"),
+        backend=kwargs.get("backend", "auto"),
+    )
+    pages = _SearchPagePrefetcher(search_fn, kwargs, prefetch=prefetch, max_pages=max_pages)
+    seen: set[str] = set()
+    yielded = 0
+    first = True
+    try:
+        while True:
+            results, error = pages.next_page()
+            if error is not None:
+                # ddgs raises "No results found" once the pages run out; any other failure is real.
+                if first or classify_search_error(error) != "empty":
+                    raise error
+                return
+            first = False
+            fresh = 0
+            for item in results:
+                key = _result_key(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                fresh += 1
+                yield item
+                yielded += 1
+                if limit and yielded >= limit:
+                    return
+            if not fresh:
+                return
+    finally:
+        pages.close()
+
+
+class DDGSSessionPool:
+    def __init__(
+        self, *, proxy: str | None = None, timeout: int = 5, verify: bool | str = True, max_idle: int = 4
+    ) -> None:
+        self.options: dict[str, Any] = {"proxy": proxy, "timeout": timeout, "verify": verify}
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: list[Any] = []
+        self._closed = False
+
+    # Sessions are checked out per call rather than pinned to a thread: the HTTP server starts a thread
+    # per connection, so per-thread sessions would never be reused nor freed.
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        with self._lock:
+            ddgs = self._idle.pop() if self._idle else None
+        if ddgs is None:
+            ddgs = _ddgs_class()(**self.options)
+        try:
+            yield ddgs
+        finally:
+            with self._lock:
+                keep = not self._closed and len(self._idle) < self.max_idle
+                if keep:
+                    self._idle.append(ddgs)
+            if not keep:
+                ddgs.__exit__(None, None, None)
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._idle = self._idle, []
+            self._closed = True
+        for ddgs in clients:
+            ddgs.__exit__(None, None, None)
+
+
+def duckse_cache_dir() -> Path:
+    configured = os.environ.get("DUCKSE_CACHE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base).expanduser() / "duckse"
+
+
+def cache_enabled_by_env() -> bool:
+    return os.environ.get("DUCKSE_CACHE", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@functools.cache
+def _fcntl() -> Any | None:
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - Windows: only threads in this process are coordinated
+        return None
+    return fcntl
+
+
+def parse_rate_limits(spec: str) -> dict[str, tuple[float, float]]:
+    limits = dict(RATE_LIMIT_DEFAULTS)
+    for item in spec.split(","):
+        name, sep, value = item.strip().partition("=")
+        if not sep:
+            continue
+        rate_text, _, burst_text = value.partition(":")
+        try:
+            rate = float(rate_text)
+            burst = float(burst_text) if burst_text else max(1.0, rate)
+        except ValueError as exc:
+            raise ValueError(f"DUCKSE_RATE_LIMITS tidak valid: {item.strip()}") from exc
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"DUCKSE_RATE_LIMITS tidak valid: {item.strip()}")
+        limits[name.strip()] = (rate, burst)
+    return limits
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        path: str | Path | None = None,
+        *,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        self.limits = dict(RATE_LIMIT_DEFAULTS if limits is None else limits)
+        self.path = Path(path) if path is not None else duckse_cache_dir() / "ratelimit.json"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, Any]]:
+        # Token buckets live in one JSON file shared by every duckse process, guarded by flock.
+        with self._lock, open(self.path.with_suffix(".lock"), "a") as lock_file:
+            fcntl = _fcntl()
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                state = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                state = {}
+            yield state
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state))
+            os.replace(tmp_path, self.path)
+
+    def _limit(self, upstream: str) -> tuple[float, float] | None:
+        return self.limits.get(upstream) or self.limits.get(upstream.split(":", 1)[0])
+
+    def _bucket(self, state: dict[str, Any], upstream: str, now: float) -> dict[str, Any]:
+        bucket = state.setdefault(upstream, {"updated": now, "blocked_until": 0.0})
+        limit = self._limit(upstream)
+        if limit is not None:
+            rate, burst = limit
+            if bucket.get("burst") != burst:
+                bucket.update(tokens=burst, burst=burst)
+            bucket["tokens"] = min(burst, bucket["tokens"] + max(0.0, now - bucket["updated"]) * rate)
+        bucket["updated"] = now
+        return bucket
+
+    def try_acquire(self, upstream: str) -> float:
+        limit = self._limit(upstream)
+        with self._state() as state:
+            now = self._clock()
+            bucket = self._bucket(state, upstream, now)
+            if now < bucket["blocked_until"]:
+                return bucket["blocked_until"] - now
+            if limit is None:
+                return 0.0
+            if bucket["tokens"] >= 1:
+                bucket["tokens"] -= 1
+                return 0.0
+            return (1 - bucket["tokens"]) / limit[0]
+
+    def acquire(self, upstream: str) -> None:
+        while (wait := self.try_acquire(upstream)) > 0:
+            self._sleep(wait)
+
+    def block(self, upstream: str, seconds: float) -> None:
+        with self._state() as state:
+            now = self._clock()
+            bucket = self._bucket(state, upstream, now)
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + seconds)
+
+
+_rate_limiter: RateLimiter | None = None
+
+
+def rate_limiter() -> RateLimiter | None:
+    global _rate_limiter
+    spec = os.environ.get("DUCKSE_RATE_LIMITS", "").strip()
+    if spec.lower() in {"", "0", "off", "false"}:
+        return None
+    limiter = _rate_limiter
+    limits = parse_rate_limits(spec)
+    if limiter is None or limiter.limits != limits or limiter.path.parent != duckse_cache_dir():
+        limiter = _rate_limiter = RateLimiter(limits)
+    return limiter
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(retry: int, retry_after: float | None = None) -> float:
+    if retry_after is not None:
+        # Honour the server's hint, plus a little jitter so waiting processes do not retry in lockstep.
+        return min(retry_after, RETRY_AFTER_MAX_SECONDS) + random.uniform(0, RATE_LIMIT_BACKOFF_SECONDS)
+    ceiling = min(RATE_LIMIT_MAX_BACKOFF_SECONDS, RATE_LIMIT_BACKOFF_SECONDS * 2**retry)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def call_with_rate_limit(
+    upstream: str,
+    fn: Callable[[], T],
+    *,
+    is_rate_limited: Callable[[Exception], bool],
+) -> T:
+    limiter = rate_limiter()
+    for retry in range(RATE_LIMIT_MAX_RETRIES + 1):
+        if limiter is not None:
+            limiter.acquire(upstream)
+        try:
+            return fn()
+        except Exception as exc:
+            if retry == RATE_LIMIT_MAX_RETRIES or not is_rate_limited(exc):
+                raise
+            delay = retry_delay(retry, getattr(exc, "retry_after", None))
+            if limiter is None:
+                time.sleep(delay)
+            else:
+                # The next acquire() waits out the block, which other processes honour as well.
+                limiter.block(upstream, delay)
+    raise AssertionError("unreachable")
+
+
+class _SqliteStore:
+    filename = "store.sqlite3"
+    schema = ""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else duckse_cache_dir() / self.filename
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        import sqlite3
+
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(self.schema)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SearchCache(_SqliteStore):
+    filename = "search.sqlite3"
+    schema = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+    """
+
+    def __init__(self, path: str | Path | None = None, max_bytes: int = SEARCH_CACHE_MAX_BYTES) -> None:
+        super().__init__(path)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode()), now + ttl, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        stale: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            stale.append(key)
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in stale])
+
+
+class RedirectCache(_SqliteStore):
+    filename = "redirects.sqlite3"
+    schema = """
+        CREATE TABLE IF NOT EXISTS redirects (
+            url TEXT PRIMARY KEY,
+            final_url TEXT,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS hosts (
+            host TEXT PRIMARY KEY,
+            checks INTEGER NOT NULL,
+            redirects INTEGER NOT NULL
+        );
+    """
+
+    def lookup_many(self, urls: list[str]) -> dict[str, str | None]:
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return {}
+        now = time.time()
+        hosts = {url: urlparse(url).netloc.lower() for url in unique}
+        found: dict[str, str | None] = {}
+        with self._lock:
+            for url in unique:
+                row = self._conn.execute(
+                    "SELECT final_url FROM redirects WHERE url = ? AND expires_at > ?", (url, now)
+                ).fetchone()
+                if row is not None:
+                    found[url] = row[0]
+            for url in unique:
+                if url in found:
+                    continue
+                row = self._conn.execute(
+                    "SELECT checks, redirects FROM hosts WHERE host = ?", (hosts[url],)
+                ).fetchone()
+                # Hosts that never redirected are answered locally with the URL itself.
+                if row is not None and row[0] >= NON_REDIRECT_HOST_MIN_CHECKS and row[1] == 0:
+                    found[url] = url
+        return found
+
+    def store_many(self, resolved: dict[str, str | None]) -> None:
+        if not resolved:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            for url, final_url in resolved.items():
+                ttl = REDIRECT_CACHE_TTL_SECONDS if final_url else REDIRECT_NEGATIVE_TTL_SECONDS
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO redirects (url, final_url, expires_at) VALUES (?, ?, ?)",
+                    (url, final_url, now + ttl),
+                )
+                if final_url is None:
+                    continue
+                redirected = int(normalize_url(final_url) != normalize_url(url))
+                self._conn.execute(
+                    "INSERT INTO hosts (host, checks, redirects) VALUES (?, 1, ?) "
+                    "ON CONFLICT (host) DO UPDATE SET checks = checks + 1, redirects = redirects + ?",
+                    (urlparse(url).netloc.lower(), redirected, redirected),
+                )
+
+
+class ScrapeCache(_SqliteStore):
+    filename = "scrapes.sqlite3"
+    schema = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            blob_hash TEXT NOT NULL REFERENCES blobs (hash),
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+    """
+
+    def __init__(self, path: str | Path | None = None, max_bytes: int = SCRAPE_CACHE_MAX_BYTES) -> None:
+        super().__init__(path)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> tuple[dict[str, Any], float] | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT blobs.data, entries.created_at, entries.expires_at FROM entries "
+                "JOIN blobs ON blobs.hash = entries.blob_hash WHERE entries.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._delete_orphans()
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def put(self, key: str, url: str, payload: dict[str, Any], ttl: float) -> None:
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()
+        digest = hashlib.sha256(encoded).hexdigest()
+        compressed = zlib.compress(encoded, 6)
+        now = time.time()
+        with self._lock, self._conn:
+            # Identical payloads (same page under several keys) share one blob.
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                (digest, compressed, len(compressed)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, url, blob_hash, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, digest, now, now + ttl, now),
+            )
+            self._delete_orphans()
+            self._evict(now)
+
+    def _delete_orphans(self) -> None:
+        self._conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT blob_hash FROM entries)")
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        if self._total_bytes() <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        self._delete_orphans()
+        while self._total_bytes() > self.max_bytes:
+            row = self._conn.execute("SELECT key FROM entries ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            self._delete_orphans()
+
+
+class LocalIndex(_SqliteStore):
+    filename = "index.sqlite3"
+    schema = """
+        CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            indexed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pages_indexed ON pages (indexed_at);
+        CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+            title, markdown, tokenize = 'unicode61 remove_diacritics 2'
+        );
+    """
+
+    def upsert(self, url: str, title: str, markdown: str, *, source: str = "scrape") -> bool:
+        digest = hashlib.sha256(f"{title}\0{markdown}".encode()).hexdigest()
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id, content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is not None and row[1] == digest:
+                # Unchanged page: refresh its timestamp without re-tokenizing the content.
+                self._conn.execute(
+                    "UPDATE pages SET indexed_at = ?, source = ? WHERE id = ?",
+                    (now, source, row[0]),
+                )
+                return False
+            if row is None:
+                page_id = self._conn.execute(
+                    "INSERT INTO pages (url, title, content_hash, size, source, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, title, digest, len(markdown.encode()), source, now),
+                ).lastrowid
+            else:
+                page_id = row[0]
+                self._conn.execute(
+                    "UPDATE pages SET title = ?, content_hash = ?, size = ?, source = ?, indexed_at = ? "
+                    "WHERE id = ?",
+                    (title, digest, len(markdown.encode()), source, now, page_id),
+                )
+                self._conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (page_id,))
+            self._conn.execute(
+                "INSERT INTO pages_fts (rowid, title, markdown) VALUES (?, ?, ?)",
+                (page_id, title, markdown),
+            )
+        return True
+
+    def upsert_page(self, page: dict[str, Any], *, url: str | None = None, source: str = "scrape") -> bool:
+        markdown = page.get("markdown")
+        page_url = page_source_url(page) or url
+        if not isinstance(markdown, str) or not markdown or not page_url:
+            return False
+        title = (page.get("metadata") or {}).get("title") or ""
+        return self.upsert(page_url, str(title), markdown, source=source)
+
+    def search(self, query: str, limit: int = 10, *, raw: bool = False) -> list[dict[str, Any]]:
+        import sqlite3
+
+        match = query if raw else " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not match:
+            return []
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT pages.url, pages.title, pages.indexed_at, "
+                    "snippet(pages_fts, 1, '[', ']', '...', 16), bm25(pages_fts, 5.0, 1.0) AS rank "
+                    "FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+                    "WHERE pages_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+        except sqlite3.OperationalError as exc:
+            raise ValueError(f"Query index tidak valid: {exc}") from exc
+        return [
+            {
+                "url": url,
+                "title": title,
+                "indexed_at": indexed_at,
+                "snippet": snippet,
+                "score": round(-rank, 3),
+            }
+            for url, title, indexed_at, snippet, rank in rows
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pages, content_bytes, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(indexed_at), MAX(indexed_at) FROM pages"
+            ).fetchone()
+            sources = dict(
+                self._conn.execute("SELECT source, COUNT(*) FROM pages GROUP BY source").fetchall()
+            )
+        return {
+            "path": str(self.path),
+            "pages": pages,
+            "content_bytes": content_bytes,
+            "file_bytes": self.path.stat().st_size,
+            "oldest": oldest,
+            "newest": newest,
+            "sources": sources,
+        }
+
+    def prune(
+        self,
+        *,
+        max_age: float | None = LOCAL_INDEX_RETENTION_SECONDS,
+        max_pages: int | None = LOCAL_INDEX_MAX_PAGES,
+    ) -> int:
+        with self._lock, self._conn:
+            stale: list[int] = []
+            if max_age is not None:
+                cutoff = time.time() - max_age
+                rows = self._conn.execute("SELECT id FROM pages WHERE indexed_at < ?", (cutoff,))
+                stale = [row[0] for row in rows]
+            if max_pages is not None:
+                stale += [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT id FROM pages ORDER BY indexed_at DESC LIMIT -1 OFFSET ?", (max_pages,)
+                    )
+                ]
+            stale = list(dict.fromkeys(stale))
+            self._conn.executemany("DELETE FROM pages_fts WHERE rowid = ?", [(page_id,) for page_id in stale])
+            self._conn.executemany("DELETE FROM pages WHERE id = ?", [(page_id,) for page_id in stale])
+        return len(stale)
+
+
+def scrape_cache_key(url: str, formats: list[str], only_main: bool) -> str:
+    options = {"url": url, "formats": sorted(set(formats)), "onlyMainContent": only_main}
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+def search_cache_ttl(search_type: str, timelimit: str | None) -> int:
+    ttl = SEARCH_CACHE_TTL_BY_TYPE.get(search_type, SEARCH_CACHE_TTL_BY_TYPE["text"])
+    if timelimit in SEARCH_CACHE_TTL_BY_TIMELIMIT:
+        ttl = min(ttl, SEARCH_CACHE_TTL_BY_TIMELIMIT[timelimit])
+    return ttl
+
+
+def search_cache_key(options: dict[str, Any]) -> str:
+    ignored = {"proxy", "timeout", "verify", "client"}
+    normalized: dict[str, Any] = {}
+    for name, value in options.items():
+        if name in ignored or value is None:
+            continue
+        if name == "query":
+            value = " ".join(str(value).lower().split())
+        elif name == "backend":
+            value = ",".join(sorted({item.strip() for item in str(value).split(",") if item.strip()}))
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[name] = value
+    normalized.setdefault("search_type", "text")
+    encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def cached_search(search_fn: SearchFn, cache: SearchCache, *, refresh: bool = False) -> SearchFn:
+    import sqlite3
+
+    def wrapper(**kwargs: Any) -> list[dict[str, Any]]:
+        key = search_cache_key(kwargs)
+        if not refresh:
+            try:
+                hit = cache.get(key)
+            except sqlite3.Error:
+                hit = None
+            if hit is not None:
+                return hit
+
+        results = search_fn(**kwargs)
+        if results:
+            ttl = search_cache_ttl(kwargs.get("search_type", "text"), kwargs.get("timelimit"))
+            try:
+                cache.set(key, results, ttl)
+            except sqlite3.Error:
+                pass
+        return results
+
+    return wrapper
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _round_ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def _search_retryable(exc: Exception) -> bool:
+    # Waiting clears a rate limit but not a captcha challenge.
+    text = f"{exc.__class__.__name__} {exc}".lower()
+    return classify_search_error(exc) == "ratelimit" and "captcha" not in text
+
+
+def classify_search_error(exc: BaseException) -> str:
+    text = f"{exc.__class__.__name__} {exc}".lower()
+    if any(marker in text for marker in ("ratelimit", "rate limit", "429", "captcha")):
+        return "ratelimit"
+    if "no results found" in text:
+        return "empty"
+    return "error"
+
+
+class BackendStats(_SqliteStore):
+    filename = "backends.sqlite3"
+    schema = """
+        CREATE TABLE IF NOT EXISTS calls (
+            backend TEXT NOT NULL,
+            search_type TEXT NOT NULL,
+            ts REAL NOT NULL,
+            latency REAL NOT NULL,
+            outcome TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS calls_backend ON calls (search_type, backend, ts);
+        CREATE TABLE IF NOT EXISTS breakers (
+            backend TEXT NOT NULL,
+            search_type TEXT NOT NULL,
+            failures INTEGER NOT NULL,
+            open_until REAL NOT NULL,
+            PRIMARY KEY (backend, search_type)
+        );
+    """
+
+    def record(self, backend: str, search_type: str, latency: float, outcome: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO calls (backend, search_type, ts, latency, outcome) VALUES (?, ?, ?, ?, ?)",
+                (backend, search_type, now, latency, outcome),
+            )
+            self._conn.execute("DELETE FROM calls WHERE ts < ?", (now - BACKEND_STATS_WINDOW_SECONDS,))
+            if outcome == "timeout":
+                # An abandoned leg proves neither health nor failure, so the breaker is left as it is.
+                return
+            if outcome not in {"error", "ratelimit"}:
+                self._conn.execute(
+                    "DELETE FROM breakers WHERE backend = ? AND search_type = ?",
+                    (backend, search_type),
+                )
+                return
+
+            row = self._conn.execute(
+                "SELECT failures FROM breakers WHERE backend = ? AND search_type = ?",
+                (backend, search_type),
+            ).fetchone()
+            failures = (row[0] if row else 0) + 1
+            open_until = 0.0
+            # Rate limits and captchas trip the breaker at once; plain errors after a few in a row.
+            if outcome == "ratelimit" or failures >= BREAKER_FAILURE_THRESHOLD:
+                excess = max(0, failures - BREAKER_FAILURE_THRESHOLD)
+                open_until = now + min(BREAKER_COOLDOWN_SECONDS * 2**excess, BREAKER_MAX_COOLDOWN_SECONDS)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO breakers (backend, search_type, failures, open_until) "
+                "VALUES (?, ?, ?, ?)",
+                (backend, search_type, failures, open_until),
+            )
+
+    def summary(self, search_type: str) -> list[dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            backends = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT backend FROM calls WHERE search_type = ? ORDER BY backend",
+                    (search_type,),
+                )
+            ]
+            breakers = {
+                row[0]: (row[1], row[2])
+                for row in self._conn.execute(
+                    "SELECT backend, failures, open_until FROM breakers WHERE search_type = ?",
+                    (search_type,),
+                )
+            }
+            samples = {
+                backend: self._conn.execute(
+                    "SELECT latency, outcome FROM calls WHERE search_type = ? AND backend = ? "
+                    "ORDER BY ts DESC LIMIT ?",
+                    (search_type, backend, BACKEND_STATS_SAMPLE),
+                ).fetchall()
+                for backend in backends
+            }
+
+        summary: list[dict[str, Any]] = []
+        for backend in backends:
+            rows = samples[backend]
+            # A timeout's latency is the elapsed time when its leg was abandoned: a lower bound, but real.
+            latencies = [latency for latency, outcome in rows if outcome in {"ok", "empty", "timeout"}]
+            outcomes = [outcome for _, outcome in rows]
+            failures, open_until = breakers.get(backend, (0, 0.0))
+            summary.append(
+                {
+                    "backend": backend,
+                    "calls": len(rows),
+                    "p50_ms": _round_ms(_percentile(latencies, 0.5)),
+                    "p90_ms": _round_ms(_percentile(latencies, 0.9)),
+                    "p99_ms": _round_ms(_percentile(latencies, 0.99)),
+                    "error_rate": round(outcomes.count("error") / len(rows), 3),
+                    "empty_rate": round(outcomes.count("empty") / len(rows), 3),
+                    "ratelimits": outcomes.count("ratelimit"),
+                    "timeouts": outcomes.count("timeout"),
+                    "consecutive_failures": failures,
+                    "circuit": "open" if open_until > now else "closed",
+                    "open_for_seconds": round(max(0.0, open_until - now), 1),
+                }
+            )
+        return summary
+
+    def rank_backends(
+        self, search_type: str, candidates: list[str], *, width: int | None = None, probes: int = 1
+    ) -> list[str]:
+        known = {item["backend"]: item for item in self.summary(search_type)}
+        scored: list[tuple[float, str]] = []
+        untried: list[str] = []
+        for backend in candidates:
+            item = known.get(backend)
+            if item is None:
+                untried.append(backend)
+                continue
+            if item["circuit"] == "open":
+                continue
+            failed = item["ratelimits"] + item["timeouts"]
+            failure_rate = item["error_rate"] + failed / max(1, item["calls"])
+            latency = item["p50_ms"] if item["p50_ms"] is not None else 10_000.0
+            scored.append((latency * (1 + 4 * failure_rate + 2 * item["empty_rate"]), backend))
+        measured = [backend for _, backend in sorted(scored)]
+        if width is None:
+            return measured + untried
+        # Untried backends fill free slots, but only `probes` of them may displace a measured one,
+        # and never the fastest.
+        picks = measured[: max(1, width - min(probes, len(untried)))]
+        return picks + untried[: width - len(picks)]
+
+
+def adaptive_backend_enabled_by_env() -> bool:
+    return os.environ.get("DUCKSE_ADAPTIVE_BACKEND", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def tracked_search(
+    search_fn: SearchFn, stats: BackendStats, *, claim: Callable[[str], bool] | None = None
+) -> SearchFn:
+    def wrapper(**kwargs: Any) -> list[dict[str, Any]]:
+        backend = str(kwargs.get("backend", "auto"))
+        search_type = kwargs.get("search_type", "text")
+        started = time.monotonic()
+        try:
+            results = search_fn(**kwargs)
+        except ValueError:
+            raise
+        except Exception as exc:
+            if claim is None or claim(backend):
+                stats.record(backend, search_type, time.monotonic() - started, classify_search_error(exc))
+            raise
+        if claim is None or claim(backend):
+            stats.record(backend, search_type, time.monotonic() - started, "ok" if results else "empty")
+        return results
+
+    return wrapper
+
+
+def adaptive_search(
+    search_fn: SearchFn,
+    stats: BackendStats,
+    *,
+    width: int = ADAPTIVE_BACKEND_WIDTH,
+    first_n: int | None = None,
+    fanout: bool = False,
+) -> SearchFn:
+    tracked = tracked_search(search_fn, stats)
+
+    def tracked_fanout(kwargs: dict[str, Any], cutoff: int | None) -> list[dict[str, Any]]:
+        search_type = kwargs.get("search_type", "text")
+        lock = threading.Lock()
+        settled: dict[str, str] = {}
+
+        def claim(backend: str, how: str) -> bool:
+            with lock:
+                return settled.setdefault(backend, how) == how
+
+        # Legs cut off by first_n may never finish (the CLI exits first), so they are recorded as
+        # timeouts now; each leg is recorded once, by whichever of finishing or cutoff comes first.
+        def give_up(backend: str, elapsed: float) -> None:
+            if claim(backend, "abandoned"):
+                stats.record(backend, search_type, elapsed, "timeout")
+
+        legs = tracked_search(search_fn, stats, claim=lambda backend: claim(backend, "done"))
+        return fanout_search(legs, first_n=cutoff, on_abandon=give_up)(**kwargs)
+
+    def wrapper(**kwargs: Any) -> list[dict[str, Any]]:
+        search_type = kwargs.get("search_type", "text")
+        backend = str(kwargs.get("backend", "auto")).strip()
+        if backend == "auto":
+            candidates = sorted(SEARCH_BACKENDS.get(search_type, {"auto"}) - {"auto"})
+            ranked = stats.rank_backends(search_type, candidates, width=max(1, width))
+            if ranked:
+                cutoff = first_n or kwargs.get("max_results")
+                return tracked_fanout({**kwargs, "backend": ",".join(ranked)}, cutoff)
+            return search_fn(**kwargs)
+        # Explicit backends keep their normal meaning; only --fanout/--first-n merge them with RRF.
+        if fanout:
+            return tracked_fanout(kwargs, first_n)
+        return tracked(**kwargs)
+
+    return wrapper
+
+
+def run_backends(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Statistik kesehatan backend DDGS")
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Tampilkan latency, error rate, dan status circuit breaker",
+    )
+    stats_parser.add_argument(
+        "--type",
+        dest="search_type",
+        default="text",
+        choices=["text", "images", "videos", "news", "books"],
+    )
+    stats_parser.add_argument("--json", action="store_true")
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return int(exc.code)
+
+    summary = BackendStats().summary(args.search_type)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return 0
+    if not summary:
+        print("Belum ada statistik backend.")
+        return 0
+    for item in summary:
+        p50 = "-" if item["p50_ms"] is None else f"{item['p50_ms']:.0f}ms"
+        p99 = "-" if item["p99_ms"] is None else f"{item['p99_ms']:.0f}ms"
+        print(
+            f"{item['backend']:<12} calls={item['calls']:<4} p50={p50:<8} p99={p99:<8} "
+            f"error={item['error_rate']:.0%} empty={item['empty_rate']:.0%} "
+            f"ratelimit={item['ratelimits']} timeout={item['timeouts']} circuit={item['circuit']}"
+        )
+    return 0
+
+
+def run_intent(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Tampilkan intent rule yang cocok untuk query")
+    parser.add_argument("query", nargs="+", help="Query; bisa lebih dari satu")
+    parser.add_argument(
+        "--type",
+        dest="search_type",
+        default="text",
+        choices=["text", "images", "videos", "news", "books"],
+    )
+    parser.add_argument("--region", default="us-en")
+    parser.add_argument("--timelimit", choices=["d", "w", "m", "y"])
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return int(exc.code)
+
+    for query in args.query:
+        try:
+            intent = explain_query_defaults(
+                query=query, search_type=args.search_type, region=args.region, timelimit=args.timelimit
+            )
+        except ValueError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        print(json.dumps({"input": query, **intent}, ensure_ascii=False))
+    return 0
+
+
+def run_local(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Cari di index lokal hasil scrape (tanpa jaringan)")
+    parser.add_argument("query", help="Kata kunci; semua kata harus muncul")
+    parser.add_argument("--limit", type=int, default=10, help="Jumlah hasil")
+    parser.add_argument("--fts", action="store_true", help="Perlakukan query sebagai sintaks FTS5 mentah")
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    args = parser.parse_args(argv)
+
+    index = LocalIndex()
+    try:
+        results = index.search(args.query, args.limit, raw=args.fts)
+    except ValueError as exc:
+        parser.error(str(exc))
+    finally:
+        index.close()
+
+    if args.json:
+        print(dumps_json(results, indent=True))
+        return 0
+    if not results:
+        print("Tidak ada hasil di index lokal.")
+        return 0
+    for idx, item in enumerate(results, start=1):
+        indexed = time.strftime("%Y-%m-%d", time.localtime(item["indexed_at"]))
+        print(f"{idx}. {item['title'] or 'N/A'}")
+        print(f"   URL: {item['url']}")
+        print(f"   Diindeks: {indexed}")
+        print(f"   {' '.join(item['snippet'].split())}")
+    return 0
+
+
+def run_index(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Kelola index lokal hasil scrape")
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+    subparsers.add_parser("stats", help="Tampilkan jumlah halaman dan ukuran index")
+    prune_parser = subparsers.add_parser("prune", help="Hapus halaman lama sesuai retensi")
+    prune_parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=LOCAL_INDEX_RETENTION_SECONDS / 86400,
+        help="Hapus halaman yang terakhir diindeks lebih lama dari ini",
+    )
+    prune_parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=LOCAL_INDEX_MAX_PAGES,
+        help="Simpan paling banyak N halaman terbaru",
+    )
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return int(exc.code)
+
+    index = LocalIndex()
+    try:
+        if args.subcommand == "prune":
+            removed = index.prune(max_age=args.older_than_days * 86400, max_pages=args.max_pages)
+            print(dumps_json({"removed": removed, **index.stats()}, indent=True))
+        else:
+            print(dumps_json(index.stats(), indent=True))
+    finally:
+        index.close()
+    return 0
+
+
+def _firecrawl_api_key() -> str:
+    api_key = os.environ.get("FIRECRAWL_API_KEY")
+    if not api_key:
+        raise ValueError("FIRECRAWL_API_KEY belum diset")
+    return api_key
+
+
+def _decode_body(raw: bytes, encoding: str | None) -> bytes:
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+def _firecrawl_headers(api_key: str, body: bytes | None) -> dict[str, str]:
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": "duckse/1.0",
+    }
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    return headers
+
+
+class FirecrawlRateLimited(ValueError):
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _firecrawl_response(
+    status: int,
+    reason: str,
+    raw: bytes,
+    encoding: str | None,
+    retry_after: str | None = None,
+) -> dict[str, Any]:
+    try:
+        data = _decode_body(raw, encoding)
+    except (OSError, zlib.error) as exc:
+        raise ValueError(f"Firecrawl API network error: {exc}") from exc
+    if status >= 400:
+        text = data.decode(errors="ignore")
+        message = f"Firecrawl API error {status}: {text or reason}"
+        if status == 429 or (status == 503 and retry_after):
+            raise FirecrawlRateLimited(message, parse_retry_after(retry_after))
+        raise ValueError(message)
+    return json.loads(data.decode())
+
+
+def _is_firecrawl_rate_limited(exc: Exception) -> bool:
+    return isinstance(exc, FirecrawlRateLimited)
+
+
+def _proxy_for(url: str) -> Any | None:
+    from urllib.request import getproxies, proxy_bypass
+
+    parsed = urlsplit(url)
+    proxy = getproxies().get(parsed.scheme)
+    if not proxy or proxy_bypass(parsed.hostname or ""):
+        return None
+    return urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+
+def _connection_dropped(sock: Any) -> bool:
+    import select
+
+    # An idle keep-alive socket only turns readable when the server has closed it (or sent junk).
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class _FirecrawlEndpoint:
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        max_idle: int = FIRECRAWL_MAX_IDLE_CONNECTIONS,
+    ) -> None:
+        self.base_url = (base_url or firecrawl_base_url()).rstrip("/")
+        parsed = urlparse(self.base_url)
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError(f"Firecrawl base URL tidak valid: {self.base_url}")
+        self._scheme = parsed.scheme
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._prefix = parsed.path.rstrip("/")
+        self._max_idle = max_idle
+        default_port = 443 if self._scheme == "https" else 80
+        self._netloc = self._host if self._port in {None, default_port} else f"{self._host}:{self._port}"
+        self._proxy = _proxy_for(self.base_url)
+        self._proxy_headers: dict[str, str] = {}
+        if self._proxy is not None and self._proxy.username:
+            import base64
+
+            credentials = f"{unquote(self._proxy.username)}:{unquote(self._proxy.password or '')}"
+            token = base64.b64encode(credentials.encode()).decode()
+            self._proxy_headers["Proxy-Authorization"] = f"Basic {token}"
+
+    def _target(self, path: str) -> str:
+        # Plain-HTTP requests through a proxy carry the absolute URL; HTTPS goes through a CONNECT tunnel.
+        if self._proxy is not None and self._scheme == "http":
+            return f"http://{self._netloc}{self._prefix}{path}"
+        return f"{self._prefix}{path}"
+
+    def relative_path(self, url: str) -> str:
+        if url.startswith(self.base_url):
+            return url[len(self.base_url) :]
+        parsed = urlparse(url)
+        path = parsed.path
+        if self._prefix and path.startswith(self._prefix):
+            path = path[len(self._prefix) :]
+        return f"{path}?{parsed.query}" if parsed.query else path
+
+
+class FirecrawlClient(_FirecrawlEndpoint):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        max_idle: int = FIRECRAWL_MAX_IDLE_CONNECTIONS,
+    ) -> None:
+        super().__init__(base_url, max_idle=max_idle)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self, timeout: float) -> http.client.HTTPConnection:
+        import http.client
+
+        conn = None
+        while conn is None:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            if conn.sock is not None and _connection_dropped(conn.sock):
+                conn.close()
+                conn = None
+        if conn is None and self._proxy is None:
+            connection_class = (
+                http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            )
+            conn = connection_class(self._host, self._port, timeout=timeout)
+        elif conn is None and self._scheme == "https":
+            conn = http.client.HTTPSConnection(self._proxy.hostname, self._proxy.port, timeout=timeout)
+            conn.set_tunnel(self._host, self._port, headers=self._proxy_headers)
+        elif conn is None:
+            conn = http.client.HTTPConnection(self._proxy.hostname, self._proxy.port, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        api_key: str,
+        payload: dict[str, Any] | None = None,
+        timeout: float = 60,
+    ) -> dict[str, Any]:
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = _firecrawl_headers(api_key, body)
+        if self._proxy is not None and self._scheme == "http":
+            headers.update(self._proxy_headers)
+
+        def request_once() -> dict[str, Any]:
+            with trace_span("firecrawl_request", method=method, path=path) as span:
+                return self._request(method, path, body, headers, timeout, span)
+
+        return call_with_rate_limit("firecrawl", request_once, is_rate_limited=_is_firecrawl_rate_limited)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+        span: dict[str, Any],
+    ) -> dict[str, Any]:
+        import http.client
+
+        for attempt in range(2):
+            conn = self._acquire(timeout)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, self._target(path), body=body, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                conn.close()
+                # A pooled connection the server closed in the meantime; only requests that are safe to
+                # send twice are retried, since the server may already have acted on a POST.
+                if reused and attempt == 0 and method in {"GET", "HEAD"}:
+                    continue
+                raise ValueError(f"Firecrawl API network error: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise ValueError(f"Firecrawl API network error: {exc}") from exc
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+
+            span.update(status=resp.status, bytes=len(raw))
+            return _firecrawl_response(
+                resp.status,
+                resp.reason,
+                raw,
+                resp.getheader("Content-Encoding"),
+                resp.getheader("Retry-After"),
+            )
+
+        raise ValueError("Firecrawl API network error: koneksi terputus")
+
+
+def firecrawl_base_url() -> str:
+    return os.environ.get("FIRECRAWL_API_URL") or FIRECRAWL_BASE_URL
+
+
+_firecrawl_client: FirecrawlClient | None = None
+_firecrawl_client_lock = threading.Lock()
+
+
+def firecrawl_client() -> FirecrawlClient:
+    global _firecrawl_client
+    base_url = firecrawl_base_url().rstrip("/")
+    with _firecrawl_client_lock:
+        if _firecrawl_client is None or _firecrawl_client.base_url != base_url:
+            if _firecrawl_client is not None:
+                _firecrawl_client.close()
+            _firecrawl_client = FirecrawlClient(base_url)
+        return _firecrawl_client
+
+
+def _firecrawl_request(
+    *,
+    method: str,
+    path: str,
+    api_key: str,
+    payload: dict[str, Any] | None = None,
+    timeout: int = 60,
+) -> dict[str, Any]:
+    return firecrawl_client().request(method, path, api_key=api_key, payload=payload, timeout=timeout)
+
+
+def _firecrawl_search_payload(query: str, limit: int, lang: str, country: str) -> dict[str, Any]:
+    return {"query": query, "limit": limit, "lang": lang, "country": country}
+
+
+def _firecrawl_scrape_payload(url: str, formats: list[str], only_main: bool) -> dict[str, Any]:
+    return {"url": url, "formats": formats, "onlyMainContent": only_main}
+
+
+def _firecrawl_crawl_payload(url: str, limit: int) -> dict[str, Any]:
+    return {
+        "url": url,
+        "limit": limit,
+        "scrapeOptions": {"formats": ["markdown"], "onlyMainContent": True},
+    }
+
+
+def _firecrawl_batch_scrape_payload(urls: list[str], formats: list[str], only_main: bool) -> dict[str, Any]:
+    return {"urls": urls, "formats": formats, "onlyMainContent": only_main}
+
+
+def _firecrawl_crawl_status_path(job_id: str, skip: int | None) -> str:
+    return f"/crawl/{job_id}" if not skip else f"/crawl/{job_id}?skip={skip}"
+
+
+def firecrawl_search(query: str, limit: int, lang: str, country: str, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_search_payload(query, limit, lang, country)
+    return _firecrawl_request(method="POST", path="/search", payload=payload, api_key=api_key)
+
+
+def firecrawl_scrape(url: str, formats: list[str], only_main: bool, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_scrape_payload(url, formats, only_main)
+    return _firecrawl_request(method="POST", path="/scrape", payload=payload, api_key=api_key)
+
+
+def firecrawl_start_crawl(url: str, limit: int, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_crawl_payload(url, limit)
+    return _firecrawl_request(method="POST", path="/crawl", payload=payload, api_key=api_key)
+
+
+def firecrawl_batch_scrape(
+    urls: list[str], formats: list[str], only_main: bool, api_key: str
+) -> dict[str, Any]:
+    payload = _firecrawl_batch_scrape_payload(urls, formats, only_main)
+    return _firecrawl_request(method="POST", path="/batch/scrape", payload=payload, api_key=api_key)
+
+
+def firecrawl_check_crawl(job_id: str, api_key: str, skip: int | None = None) -> dict[str, Any]:
+    return _firecrawl_request(method="GET", path=_firecrawl_crawl_status_path(job_id, skip), api_key=api_key)
+
+
+class FirecrawlJobPoller:
+    def __init__(
+        self,
+        path: str,
+        api_key: str,
+        *,
+        poll_seconds: float = CRAWL_POLL_SECONDS,
+        max_poll_seconds: float = CRAWL_MAX_POLL_SECONDS,
+        received: int = 0,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        self.path = path
+        self.api_key = api_key
+        self.poll_seconds = max(0.0, poll_seconds)
+        self.max_poll_seconds = max(self.poll_seconds, max_poll_seconds)
+        self.received = received
+        self.status: dict[str, Any] = {}
+        self._sleep = sleep or time.sleep
+
+    def _fetch(self, path: str) -> dict[str, Any]:
+        status = _firecrawl_request(method="GET", path=path, api_key=self.api_key)
+        summary = {key: value for key, value in status.items() if key not in {"data", "next"}}
+        self.status.update(summary)
+        return status
+
+    def pages(self) -> Iterator[dict[str, Any]]:
+        interval = self.poll_seconds
+        last_completed = -1
+        while True:
+            path = f"{self.path}?skip={self.received}" if self.received else self.path
+            status = self._fetch(path)
+            new_pages = 0
+            while True:
+                data = status.get("data") or []
+                for page in data:
+                    self.received += 1
+                    new_pages += 1
+                    yield page
+                next_url = status.get("next")
+                if not data or not isinstance(next_url, str) or not next_url:
+                    break
+                status = self._fetch(firecrawl_client().relative_path(next_url))
+
+            if self.status.get("status") in FIRECRAWL_TERMINAL_STATUSES:
+                return
+
+            completed = self.status.get("completed")
+            progressed = new_pages > 0 or (isinstance(completed, int) and completed > last_completed)
+            if isinstance(completed, int):
+                last_completed = max(last_completed, completed)
+            # Poll quickly while pages keep arriving, back off while the job is stalled.
+            interval = self.poll_seconds if progressed else min(interval * 1.5, self.max_poll_seconds)
+            self._sleep(interval)
+
+
+class CrawlCheckpoint:
+    def __init__(self, path: str | Path, state: dict[str, Any]) -> None:
+        self.path = Path(path)
+        self.state = state
+
+    @classmethod
+    def load(cls, path: str | Path) -> CrawlCheckpoint:
+        try:
+            state = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as exc:
+            raise ValueError(f"Checkpoint tidak bisa dibaca: {exc}") from exc
+        if (
+            not isinstance(state, dict)
+            or not isinstance(state.get("job_id"), str)
+            or not isinstance(state.get("received", 0), int)
+        ):
+            raise ValueError(f"Checkpoint tidak valid: {path}")
+        return cls(path, state)
+
+    @property
+    def job_id(self) -> str:
+        return self.state["job_id"]
+
+    @property
+    def received(self) -> int:
+        return self.state.get("received", 0)
+
+    def save(self, **updates: Any) -> None:
+        self.state.update(updates, updated_at=time.time())
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(dumps_json(self.state, indent=True))
+        os.replace(tmp_path, self.path)
+
+    def track(self, pages: Iterable[dict[str, Any]], poller: FirecrawlJobPoller) -> Iterator[dict[str, Any]]:
+        for page in pages:
+            yield page
+            # Recorded only after the consumer has written the page out.
+            self.save(received=poller.received, status=poller.status.get("status"))
+        self.save(received=poller.received, status=poller.status.get("status"))
+
+
+class PageSpool:
+    def __init__(self, out_dir: str | Path, manifest_name: str = "manifest.jsonl") -> None:
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest = open(self.out_dir / manifest_name, "a", encoding="utf-8")  # noqa: SIM115
+        self._lock = threading.Lock()
+
+    def write(self, page: dict[str, Any], **meta: Any) -> dict[str, Any]:
+        encoded = dumps_json(page).encode()
+        path = self.out_dir / f"{hashlib.sha256(encoded).hexdigest()}.json"
+        if not path.exists():
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(encoded)
+            os.replace(tmp_path, path)
+        metadata = page.get("metadata") if isinstance(page.get("metadata"), dict) else {}
+        entry = {
+            **meta,
+            "url": meta.get("url") or metadata.get("sourceURL") or metadata.get("url"),
+            "path": str(path),
+            "bytes": len(encoded),
+        }
+        return self.record(**entry)
+
+    def record(self, **entry: Any) -> dict[str, Any]:
+        with self._lock:
+            self._manifest.write(dumps_json(entry) + "\n")
+            self._manifest.flush()
+        return entry
+
+    def close(self) -> None:
+        self._manifest.close()
+
+
+def cached_firecrawl_scrape(
+    url: str,
+    formats: list[str],
+    only_main: bool,
+    api_key: str,
+    *,
+    cache: ScrapeCache | None = None,
+    ttl: float = SCRAPE_CACHE_TTL_SECONDS,
+) -> dict[str, Any]:
+    if cache is None:
+        return firecrawl_scrape(url, formats, only_main, api_key)
+
+    key = scrape_cache_key(url, formats, only_main)
+    hit = _scrape_cache_hit(cache, key)
+    if hit is not None:
+        return hit
+
+    result = firecrawl_scrape(url, formats, only_main, api_key)
+    _scrape_cache_store(cache, key, url, result, ttl)
+    return result
+
+
+def _scrape_cache_hit(cache: ScrapeCache, key: str) -> dict[str, Any] | None:
+    hit = cache.get(key)
+    if hit is None:
+        return None
+    payload, created_at = hit
+    return {**payload, "cache": {"hit": True, "age_seconds": round(time.time() - created_at, 1)}}
+
+
+def _scrape_cache_store(cache: ScrapeCache, key: str, url: str, result: dict[str, Any], ttl: float) -> None:
+    if result.get("success", True) and result.get("data"):
+        cache.put(key, url, result, ttl)
+
+
+def page_source_url(page: dict[str, Any]) -> str | None:
+    metadata = page.get("metadata") or {}
+    url = metadata.get("sourceURL") or metadata.get("url")
+    return url if isinstance(url, str) and url else None
+
+
+def _iter_batch_scrape(
+    urls: list[str],
+    formats: list[str],
+    only_main: bool,
+    api_key: str,
+    *,
+    poll_seconds: float,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    positions: dict[str, list[int]] = {}
+    for idx, url in enumerate(urls):
+        positions.setdefault(normalize_url(url), []).append(idx)
+    try:
+        job = firecrawl_batch_scrape(urls, formats, only_main, api_key)
+        job_id = job.get("id")
+        if not isinstance(job_id, str) or not job_id:
+            raise ValueError(f"Firecrawl batch scrape tanpa id job: {job}")
+        poller = FirecrawlJobPoller(f"/batch/scrape/{job_id}", api_key, poll_seconds=poll_seconds)
+        for page in poller.pages():
+            url = page_source_url(page)
+            for idx in positions.pop(normalize_url(url), []) if url else []:
+                yield idx, {"success": True, "data": page}
+    except ValueError as exc:
+        for idx in sorted(idx for indexes in positions.values() for idx in indexes):
+            yield idx, {"success": False, "url": urls[idx], "error": str(exc)}
+        return
+
+    error = f"Tidak ada hasil dari batch scrape (status {poller.status.get('status', 'unknown')})"
+    for idx in sorted(idx for indexes in positions.values() for idx in indexes):
+        yield idx, {"success": False, "url": urls[idx], "error": error}
+
+
+def iter_firecrawl_scrape_many(
+    urls: list[str],
+    formats: list[str],
+    only_main: bool,
+    api_key: str,
+    *,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    cache: ScrapeCache | None = None,
+    cache_ttl: float = SCRAPE_CACHE_TTL_SECONDS,
+    batch_threshold: int | None = None,
+    poll_seconds: float = CRAWL_POLL_SECONDS,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    def scrape_one(url: str) -> dict[str, Any]:
+        try:
+            return firecrawl_scrape(url, formats, only_main, api_key)
+        except ValueError as exc:
+            return {"success": False, "url": url, "error": str(exc)}
+
+    keys = [scrape_cache_key(url, formats, only_main) for url in urls]
+    misses: list[int] = []
+    for idx, key in enumerate(keys):
+        hit = _scrape_cache_hit(cache, key) if cache is not None else None
+        if hit is None:
+            misses.append(idx)
+        else:
+            yield idx, hit
+    if not misses:
+        return
+
+    miss_urls = [urls[idx] for idx in misses]
+    fetched: Iterator[tuple[int, dict[str, Any]]]
+    if batch_threshold and len(misses) >= batch_threshold:
+        # One batch job plus a few polls instead of one request per URL.
+        fetched = _iter_batch_scrape(miss_urls, formats, only_main, api_key, poll_seconds=poll_seconds)
+    else:
+        fetched = _iter_scrape_threads(scrape_one, miss_urls, concurrency)
+    # Results are yielded in completion order and not retained here.
+    for position, result in fetched:
+        idx = misses[position]
+        if cache is not None:
+            _scrape_cache_store(cache, keys[idx], urls[idx], result, cache_ttl)
+        yield idx, result
+
+
+def _iter_scrape_threads(
+    scrape_one: Callable[[str], dict[str, Any]], urls: list[str], concurrency: int
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    workers = max(1, min(concurrency, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="duckse-scrape") as executor:
+        futures = {executor.submit(scrape_one, url): idx for idx, url in enumerate(urls)}
+        for future in as_completed(futures):
+            yield futures.pop(future), future.result()
+
+
+def firecrawl_scrape_many(
+    urls: list[str],
+    formats: list[str],
+    only_main: bool,
+    api_key: str,
+    *,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    cache: ScrapeCache | None = None,
+    cache_ttl: float = SCRAPE_CACHE_TTL_SECONDS,
+    batch_threshold: int | None = None,
+    poll_seconds: float = CRAWL_POLL_SECONDS,
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = [{} for _ in urls]
+    for idx, result in iter_firecrawl_scrape_many(
+        urls,
+        formats,
+        only_main,
+        api_key,
+        concurrency=concurrency,
+        cache=cache,
+        cache_ttl=cache_ttl,
+        batch_threshold=batch_threshold,
+        poll_seconds=poll_seconds,
+    ):
+        results[idx] = result
+    return results
+
+
+# asyncio counterparts. They share validation, payload builders and response decoding with the
+# sync functions above; asyncio itself is imported lazily to keep CLI startup unchanged.
+async def asearch(*, pool: DDGSSessionPool | None = None, **kwargs: Any) -> list[dict[str, Any]]:
+    import asyncio
+
+    validate_search_options(
+        search_type=kwargs.get("search_type", "text"),
+        timelimit=kwargs.get("timelimit"),
+        backend=kwargs.get("backend", "auto"),
+    )
+
+    def run_search() -> list[dict[str, Any]]:
+        if pool is not None and kwargs.get("client") is None:
+            with pool.checkout() as ddgs:
+                return search(**{**kwargs, "client": ddgs})
+        return search(**kwargs)
+
+    # ddgs is synchronous; each executor thread checks a session out of the pool for the call.
+    return await asyncio.to_thread(run_search)
+
+
+@functools.cache
+def _ssl_context() -> Any:
+    import ssl
+
+    return ssl.create_default_context()
+
+
+async def _aopen_connection(scheme: str, host: str, port: int | None) -> tuple[Any, Any]:
+    import asyncio
+
+    if scheme == "https":
+        return await asyncio.open_connection(host, port or 443, ssl=_ssl_context(), server_hostname=host)
+    return await asyncio.open_connection(host, port or 80)
+
+
+def _http_message(method: str, target: str, host: str, headers: dict[str, str], body: bytes | None) -> bytes:
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    if body is not None:
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+
+async def _aread_response(reader: Any, *, read_body: bool = True) -> tuple[int, str, dict[str, str], bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by server")
+    parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    status = int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ""
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in {b"\r\n", b"\n", b""}:
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    # HTTP/1.0 connections close after the response unless the server explicitly keeps them alive.
+    if parts[0] == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+
+    if not read_body or status in {204, 304} or 100 <= status < 200:
+        return status, reason, headers, b""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks: list[bytes] = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in {b"\r\n", b"\n", b""}:
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return status, reason, headers, b"".join(chunks)
+    if "content-length" in headers:
+        return status, reason, headers, await reader.readexactly(int(headers["content-length"]))
+    headers["connection"] = "close"
+    return status, reason, headers, await reader.read()
+
+
+async def _afinal_url(url: str, method: str) -> tuple[int, str]:
+    from urllib.parse import urljoin
+
+    for _ in range(ASYNC_MAX_REDIRECTS + 1):
+        parsed = urlsplit(url)
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        target = urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+        headers = {"User-Agent": "duckse/1.0", "Connection": "close"}
+        reader, writer = await _aopen_connection(parsed.scheme, parsed.hostname, parsed.port)
+        try:
+            writer.write(_http_message(method, target, parsed.netloc, headers, None))
+            await writer.drain()
+            # Only the status line and headers are read; the body is never consumed.
+            status, _, response_headers, _ = await _aread_response(reader, read_body=False)
+        finally:
+            writer.close()
+        location = response_headers.get("location")
+        if status in {301, 302, 303, 307, 308} and location:
+            url = urljoin(url, location)
+            continue
+        return status, url
+    raise ValueError(f"too many redirects: {url}")
+
+
+async def aresolve_url(url: str, timeout: float = 6) -> str | None:
+    import asyncio
+
+    if _proxy_for(url) is not None:
+        # The asyncio transport only talks to origin servers directly; urllib handles the proxy.
+        return await asyncio.to_thread(resolve_url, url, math.ceil(timeout))
+    with trace_span("resolve_url", url=url) as span:
+        try:
+            status, final_url = await asyncio.wait_for(_afinal_url(url, "HEAD"), timeout)
+            if status >= 400:
+                status, final_url = await asyncio.wait_for(_afinal_url(url, "GET"), timeout)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            status = 599
+        span["resolved"] = status < 400
+        if status >= 400:
+            return None
+    return _absolute_url(final_url)
+
+
+async def aresolve_urls(
+    urls: list[str],
+    resolver: Callable[[str], Awaitable[str | None]] = aresolve_url,
+    *,
+    max_workers: int = EXPAND_MAX_WORKERS,
+    per_host: int = EXPAND_PER_HOST,
+    budget: float = EXPAND_BUDGET_SECONDS,
+    cache: RedirectCache | None = None,
+) -> dict[str, str | None]:
+    import asyncio
+
+    known = cache.lookup_many(urls) if cache is not None else {}
+    misses = [url for url in dict.fromkeys(urls) if url not in known]
+    if not misses:
+        return known
+    workers = asyncio.Semaphore(max(1, max_workers))
+    host_slots = {urlparse(url).netloc.lower(): asyncio.Semaphore(max(1, per_host)) for url in misses}
+
+    async def resolve_one(url: str) -> str | None:
+        async with host_slots[urlparse(url).netloc.lower()], workers:
+            try:
+                return await resolver(url)
+            except Exception:  # noqa: BLE001
+                return None
+
+    tasks = {asyncio.ensure_future(resolve_one(url)): url for url in misses}
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, budget))
+    for task in pending:
+        task.cancel()
+    # Like resolve_urls, URLs still running when the budget ends are left unrecorded.
+    resolved = {tasks[task]: task.result() for task in done}
+    if cache is not None:
+        cache.store_many(resolved)
+    return {**known, **resolved}
+
+
+class AsyncFirecrawlClient(_FirecrawlEndpoint):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        max_idle: int = FIRECRAWL_MAX_IDLE_CONNECTIONS,
+    ) -> None:
+        super().__init__(base_url, max_idle=max_idle)
+        self._idle: list[tuple[Any, Any]] = []
+        self._proxied: FirecrawlClient | None = None
+
+    def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        if self._proxied is not None:
+            self._proxied.close()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        api_key: str,
+        payload: dict[str, Any] | None = None,
+        timeout: float = 60,
+    ) -> dict[str, Any]:
+        import asyncio
+
+        if self._proxy is not None:
+            # The asyncio transport speaks plain HTTP/1.1 to the origin only; proxied setups reuse the
+            # sync client, which handles CONNECT tunnels, in a worker thread.
+            if self._proxied is None:
+                self._proxied = FirecrawlClient(self.base_url, max_idle=self._max_idle)
+            return await asyncio.to_thread(
+                self._proxied.request, method, path, api_key=api_key, payload=payload, timeout=timeout
+            )
+        body = json.dumps(payload).encode() if payload is not None else None
+        message = _http_message(
+            method, f"{self._prefix}{path}", self._netloc, _firecrawl_headers(api_key, body), body
+        )
+        limiter = rate_limiter()
+        for retry in range(RATE_LIMIT_MAX_RETRIES + 1):
+            # Same shared buckets as call_with_rate_limit; the flock and state file I/O run in a worker
+            # thread and waiting uses asyncio.sleep, so the event loop is never blocked.
+            while limiter is not None:
+                wait = await asyncio.to_thread(limiter.try_acquire, "firecrawl")
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            try:
+                return await self._request(method, path, message, timeout)
+            except FirecrawlRateLimited as exc:
+                if retry == RATE_LIMIT_MAX_RETRIES:
+                    raise
+                delay = retry_delay(retry, exc.retry_after)
+                if limiter is None:
+                    await asyncio.sleep(delay)
+                else:
+                    await asyncio.to_thread(limiter.block, "firecrawl", delay)
+        raise AssertionError("unreachable")
+
+    async def _request(self, method: str, path: str, message: bytes, timeout: float) -> dict[str, Any]:
+        import asyncio
 
-        if search_type == "images":
-            return ddgs.images(
-                query,
-                region=region,
-                safesearch=safesearch,
-                timelimit=timelimit,
-                max_results=max_results,
-                page=page,
-                backend=backend,
-                size=size,
-                color=color,
-                type_image=type_image,
-                layout=layout,
-                license_image=license_image,
-            )
+        with trace_span("firecrawl_request", method=method, path=path) as span:
+            for attempt in range(2):
+                while self._idle and self._idle[-1][0].at_eof():
+                    # Closed by the server while idle; never worth sending a request into.
+                    self._idle.pop()[1].close()
+                reused = bool(self._idle)
+                writer = None
+                keep = False
+                try:
+                    if reused:
+                        reader, writer = self._idle.pop()
+                    else:
+                        reader, writer = await asyncio.wait_for(
+                            _aopen_connection(self._scheme, self._host, self._port), timeout
+                        )
+                    writer.write(message)
+                    await writer.drain()
+                    status, reason, headers, raw = await asyncio.wait_for(_aread_response(reader), timeout)
+                    keep = headers.get("connection", "").lower() != "close"
+                    keep = keep and len(self._idle) < self._max_idle
+                except (asyncio.IncompleteReadError, ConnectionError) as exc:
+                    # Like the sync client, only requests that are safe to send twice are retried on a
+                    # fresh connection, since the server may already have acted on a POST.
+                    if reused and attempt == 0 and method in {"GET", "HEAD"}:
+                        continue
+                    raise ValueError(f"Firecrawl API network error: {exc}") from exc
+                except (OSError, asyncio.TimeoutError, ValueError) as exc:
+                    raise ValueError(f"Firecrawl API network error: {exc}") from exc
+                finally:
+                    if writer is not None and not keep:
+                        writer.close()
+                if keep:
+                    self._idle.append((reader, writer))
+                span.update(status=status, bytes=len(raw))
+                return _firecrawl_response(
+                    status, reason, raw, headers.get("content-encoding"), headers.get("retry-after")
+                )
 
-        if search_type == "videos":
-            return ddgs.videos(
-                query,
-                region=region,
-                safesearch=safesearch,
-                timelimit=timelimit,
-                max_results=max_results,
-                page=page,
-                backend=backend,
-                resolution=resolution,
-                duration=duration,
-                license_videos=license_videos,
-            )
+        raise ValueError("Firecrawl API network error: koneksi terputus")
 
-        if search_type == "news":
-            return ddgs.news(
-                query,
-                region=region,
-                safesearch=safesearch,
-                timelimit=timelimit,
-                max_results=max_results,
-                page=page,
-                backend=backend,
-            )
 
-        if search_type == "books":
-            return ddgs.books(
-                query,
-                max_results=max_results,
-                page=page,
-                backend=backend,
-            )
+_async_firecrawl_clients: weakref.WeakKeyDictionary[Any, AsyncFirecrawlClient] = weakref.WeakKeyDictionary()
 
-    raise ValueError(f"Unsupported search type: {search_type}")
 
+def async_firecrawl_client() -> AsyncFirecrawlClient:
+    import asyncio
 
-def _firecrawl_api_key() -> str:
-    api_key = os.environ.get("FIRECRAWL_API_KEY")
-    if not api_key:
-        raise ValueError("FIRECRAWL_API_KEY belum diset")
-    return api_key
+    # Streams belong to one event loop, so each running loop gets its own pool.
+    loop = asyncio.get_running_loop()
+    base_url = firecrawl_base_url().rstrip("/")
+    client = _async_firecrawl_clients.get(loop)
+    if client is None or client.base_url != base_url:
+        if client is not None:
+            client.close()
+        client = _async_firecrawl_clients[loop] = AsyncFirecrawlClient(base_url)
+    return client
 
 
-def _firecrawl_request(
-    *,
-    method: str,
-    path: str,
+async def afirecrawl_search(query: str, limit: int, lang: str, country: str, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_search_payload(query, limit, lang, country)
+    return await async_firecrawl_client().request("POST", "/search", api_key=api_key, payload=payload)
+
+
+async def afirecrawl_scrape(url: str, formats: list[str], only_main: bool, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_scrape_payload(url, formats, only_main)
+    return await async_firecrawl_client().request("POST", "/scrape", api_key=api_key, payload=payload)
+
+
+async def afirecrawl_start_crawl(url: str, limit: int, api_key: str) -> dict[str, Any]:
+    payload = _firecrawl_crawl_payload(url, limit)
+    return await async_firecrawl_client().request("POST", "/crawl", api_key=api_key, payload=payload)
+
+
+async def afirecrawl_check_crawl(job_id: str, api_key: str, skip: int | None = None) -> dict[str, Any]:
+    path = _firecrawl_crawl_status_path(job_id, skip)
+    return await async_firecrawl_client().request("GET", path, api_key=api_key)
+
+
+async def afirecrawl_scrape_many(
+    urls: list[str],
+    formats: list[str],
+    only_main: bool,
     api_key: str,
-    payload: dict[str, Any] | None = None,
-    timeout: int = 60,
-) -> dict[str, Any]:
-    base_url = "https://api.firecrawl.dev/v1"
-    url = f"{base_url}{path}"
-    data = json.dumps(payload).encode() if payload is not None else None
-    req = Request(
-        url,
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method=method,
-    )
-    try:
-        with urlopen(req, timeout=timeout) as resp:  # noqa: S310
-            return json.loads(resp.read().decode())
-    except HTTPError as exc:
-        body = exc.read().decode(errors="ignore")
-        raise ValueError(f"Firecrawl API error {exc.code}: {body or exc.reason}") from exc
-    except URLError as exc:
-        raise ValueError(f"Firecrawl API network error: {exc}") from exc
+    *,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    cache: ScrapeCache | None = None,
+    cache_ttl: float = SCRAPE_CACHE_TTL_SECONDS,
+) -> list[dict[str, Any]]:
+    import asyncio
 
+    slots = asyncio.Semaphore(max(1, concurrency))
 
-def firecrawl_search(query: str, limit: int, lang: str, country: str, api_key: str) -> dict[str, Any]:
-    payload = {"query": query, "limit": limit, "lang": lang, "country": country}
-    return _firecrawl_request(method="POST", path="/search", payload=payload, api_key=api_key)
+    async def scrape_one(url: str) -> dict[str, Any]:
+        key = scrape_cache_key(url, formats, only_main)
+        hit = _scrape_cache_hit(cache, key) if cache is not None else None
+        if hit is not None:
+            return hit
+        try:
+            async with slots:
+                result = await afirecrawl_scrape(url, formats, only_main, api_key)
+        except ValueError as exc:
+            return {"success": False, "url": url, "error": str(exc)}
+        if cache is not None:
+            _scrape_cache_store(cache, key, url, result, cache_ttl)
+        return result
 
+    return list(await asyncio.gather(*(scrape_one(url) for url in urls)))
 
-def firecrawl_scrape(url: str, formats: list[str], only_main: bool, api_key: str) -> dict[str, Any]:
-    payload = {"url": url, "formats": formats, "onlyMainContent": only_main}
-    return _firecrawl_request(method="POST", path="/scrape", payload=payload, api_key=api_key)
 
+def _add_scrape_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache", action="store_true", help="Pakai cache lokal hasil scrape")
+    parser.add_argument("--no-cache", action="store_true", help="Matikan cache walau DUCKSE_CACHE=1")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=SCRAPE_CACHE_TTL_SECONDS,
+        help="Umur maksimum hasil scrape di cache (detik)",
+    )
 
-def firecrawl_start_crawl(url: str, limit: int, api_key: str) -> dict[str, Any]:
-    payload = {
-        "url": url,
-        "limit": limit,
-        "scrapeOptions": {"formats": ["markdown"], "onlyMainContent": True},
+
+def _add_index_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Simpan markdown hasil scrape ke index full-text lokal (lihat `duckse local`)",
+    )
+
+
+def _crawl_checkpoint(args: argparse.Namespace, job_id: str) -> CrawlCheckpoint:
+    options = {
+        "max_pages": args.max_pages,
+        "out_dir": str(Path(args.out_dir).resolve()) if args.out_dir else None,
+        "jsonl": args.jsonl,
     }
-    return _firecrawl_request(method="POST", path="/crawl", payload=payload, api_key=api_key)
+    state = {"job_id": job_id, "url": args.url, "options": options, "received": 0, "status": None}
+    return CrawlCheckpoint(args.checkpoint, state)
+
+
+def _read_url_arguments(urls: list[str], path: str | None) -> list[str]:
+    lines: Iterable[str] = []
+    if path == "-" or (path is None and not urls and not sys.stdin.isatty()):
+        lines = sys.stdin
+    elif path is not None:
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+        except OSError as exc:
+            raise ValueError(f"File URL tidak bisa dibaca: {exc}") from exc
+    collected = [*urls, *(line.strip() for line in lines)]
+    return list(dict.fromkeys(url for url in collected if url and not url.startswith("#")))
+
+
+def _index_pages(
+    pages: Iterable[dict[str, Any]], index: LocalIndex, *, source: str
+) -> Iterator[dict[str, Any]]:
+    for page in pages:
+        index.upsert_page(page, source=source)
+        yield page
 
 
-def firecrawl_check_crawl(job_id: str, api_key: str) -> dict[str, Any]:
-    return _firecrawl_request(method="GET", path=f"/crawl/{job_id}", api_key=api_key)
+def _scrape_cache_from_args(args: argparse.Namespace) -> ScrapeCache | None:
+    if (args.cache or cache_enabled_by_env()) and not args.no_cache:
+        return ScrapeCache()
+    return None
 
 
 def run_firecrawl(argv: list[str]) -> int:
@@ -305,13 +3019,44 @@ def run_firecrawl(argv: list[str]) -> int:
     scrape_parser.add_argument("--screenshot", action="store_true")
     scrape_parser.add_argument("--json", action="store_true")
     scrape_parser.add_argument("--only-main", action="store_true", default=True)
+    _add_scrape_cache_arguments(scrape_parser)
+    _add_index_argument(scrape_parser)
 
     crawl_parser = subparsers.add_parser("crawl", help="Firecrawl crawl site")
-    crawl_parser.add_argument("url")
+    crawl_parser.add_argument("url", nargs="?")
     crawl_parser.add_argument("--max-pages", type=int, default=50)
     crawl_parser.add_argument("--wait", action="store_true")
     crawl_parser.add_argument("--json", action="store_true")
-    crawl_parser.add_argument("--poll-seconds", type=int, default=2)
+    crawl_parser.add_argument("--poll-seconds", type=float, default=CRAWL_POLL_SECONDS)
+    crawl_parser.add_argument("--max-poll-seconds", type=float, default=CRAWL_MAX_POLL_SECONDS)
+    crawl_parser.add_argument("--jsonl", action="store_true", help="Tulis tiap halaman sebagai JSONL")
+    crawl_parser.add_argument("--out-dir", help="Simpan tiap halaman sebagai file di direktori ini")
+    crawl_parser.add_argument(
+        "--checkpoint",
+        help="Simpan job id, opsi, dan jumlah halaman yang sudah diterima ke file ini",
+    )
+    crawl_parser.add_argument("--resume", metavar="CHECKPOINT", help="Lanjutkan crawl dari file checkpoint")
+    crawl_parser.add_argument("--job-id", help="Sambungkan ke job crawl yang sudah berjalan")
+    _add_index_argument(crawl_parser)
+
+    batch_parser = subparsers.add_parser(
+        "batch-scrape",
+        help="Firecrawl batch scrape banyak URL dalam satu job",
+    )
+    batch_parser.add_argument("urls", nargs="*", help="URL; kosongkan untuk membaca dari --file atau stdin")
+    batch_parser.add_argument("--file", help="File berisi satu URL per baris ('-' untuk stdin)")
+    batch_parser.add_argument("--markdown", action="store_true", default=True)
+    batch_parser.add_argument("--html", action="store_true")
+    batch_parser.add_argument("--screenshot", action="store_true")
+    batch_parser.add_argument("--only-main", action="store_true", default=True)
+    batch_parser.add_argument("--poll-seconds", type=float, default=CRAWL_POLL_SECONDS)
+    batch_parser.add_argument("--max-poll-seconds", type=float, default=CRAWL_MAX_POLL_SECONDS)
+    batch_parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Tulis tiap halaman sebagai JSONL begitu tersedia",
+    )
+    _add_index_argument(batch_parser)
 
     search_scrape = subparsers.add_parser(
         "search-scrape",
@@ -328,18 +3073,56 @@ def run_firecrawl(argv: list[str]) -> int:
     search_scrape.add_argument("--html", action="store_true")
     search_scrape.add_argument("--screenshot", action="store_true")
     search_scrape.add_argument("--json", action="store_true")
+    search_scrape.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Tulis tiap hasil scrape sebagai JSONL begitu selesai (ringkasan ke stderr)",
+    )
+    search_scrape.add_argument(
+        "--out-dir",
+        help="Simpan tiap halaman sebagai file (nama = hash konten) plus manifest.jsonl di direktori ini",
+    )
+    search_scrape.add_argument("--concurrency", type=int, default=SCRAPE_CONCURRENCY)
+    search_scrape.add_argument(
+        "--batch-threshold",
+        type=int,
+        default=SCRAPE_BATCH_THRESHOLD,
+        help="Pakai satu job batch scrape bila URL yang belum di-cache >= nilai ini (0 = nonaktif)",
+    )
+    search_scrape.add_argument(
+        "--dedupe-similar",
+        action="store_true",
+        help="Scrape satu wakil per kelompok hasil yang hampir sama (SimHash judul+ringkasan)",
+    )
+    search_scrape.add_argument(
+        "--similarity-threshold",
+        type=int,
+        default=SIMHASH_THRESHOLD,
+        help="Jarak Hamming maksimum (bit) agar dua hasil dianggap hampir sama",
+    )
+    _add_scrape_cache_arguments(search_scrape)
+    _add_index_argument(search_scrape)
+    for subparser in (search_parser, scrape_parser, crawl_parser, batch_parser, search_scrape):
+        _add_trace_arguments(subparser)
 
+    started = time.perf_counter()
     try:
         args = parser.parse_args(argv)
     except SystemExit as exc:
         return int(exc.code)
 
+    with tracing(timings=args.timings, trace_file=args.trace_file, origin=started):
+        return _run_firecrawl_command(args)
+
+
+def _run_firecrawl_command(args: argparse.Namespace) -> int:
     try:
         api_key = _firecrawl_api_key()
     except ValueError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
 
+    index = LocalIndex() if getattr(args, "index", False) else None
     try:
         if args.subcommand == "search":
             result = firecrawl_search(args.query, args.limit, args.lang, args.country, api_key)
@@ -361,7 +3144,16 @@ def run_firecrawl(argv: list[str]) -> int:
                 formats.append("html")
             if args.screenshot:
                 formats.append("screenshot")
-            result = firecrawl_scrape(args.url, formats or ["markdown"], args.only_main, api_key)
+            result = cached_firecrawl_scrape(
+                args.url,
+                formats or ["markdown"],
+                args.only_main,
+                api_key,
+                cache=_scrape_cache_from_args(args),
+                ttl=args.cache_ttl,
+            )
+            if index is not None:
+                index.upsert_page(result.get("data") or {}, url=args.url, source="scrape")
             if args.json:
                 print(json.dumps(result, indent=2, ensure_ascii=False))
             else:
@@ -374,39 +3166,124 @@ def run_firecrawl(argv: list[str]) -> int:
             return 0
 
         if args.subcommand == "crawl":
-            result = firecrawl_start_crawl(args.url, args.max_pages, api_key)
-            if not args.wait:
-                print(json.dumps(result, indent=2, ensure_ascii=False))
+            checkpoint: CrawlCheckpoint | None = None
+            if args.resume:
+                checkpoint = CrawlCheckpoint.load(args.resume)
+                job_id = checkpoint.job_id
+                options = checkpoint.state.get("options") or {}
+                args.out_dir = args.out_dir or options.get("out_dir")
+                args.jsonl = args.jsonl or bool(options.get("jsonl"))
+            elif args.job_id:
+                job_id = args.job_id
+            elif args.url:
+                result = firecrawl_start_crawl(args.url, args.max_pages, api_key)
+                job_id = result.get("id")
+                if not args.wait or not isinstance(job_id, str) or not job_id:
+                    if args.checkpoint and isinstance(job_id, str) and job_id:
+                        _crawl_checkpoint(args, job_id).save()
+                    print(json.dumps(result, indent=2, ensure_ascii=False))
+                    return 0
+            else:
+                print("Error: crawl butuh URL, --job-id, atau --resume", file=sys.stderr)
+                return 1
+            if checkpoint is None and args.checkpoint:
+                checkpoint = _crawl_checkpoint(args, job_id)
+                checkpoint.save()
+
+            poller = FirecrawlJobPoller(
+                f"/crawl/{job_id}",
+                api_key,
+                poll_seconds=max(1.0, args.poll_seconds),
+                max_poll_seconds=args.max_poll_seconds,
+                received=checkpoint.received if checkpoint is not None else 0,
+            )
+            pages = poller.pages()
+            if index is not None:
+                pages = _index_pages(pages, index, source="crawl")
+            if checkpoint is not None and (args.out_dir or args.jsonl):
+                pages = checkpoint.track(pages, poller)
+            if args.out_dir:
+                spool = PageSpool(args.out_dir)
+                try:
+                    for page in pages:
+                        spool.write(page)
+                finally:
+                    spool.close()
+                summary = {**poller.status, "pages": poller.received, "out_dir": str(spool.out_dir)}
+                print(json.dumps(summary, indent=2, ensure_ascii=False))
+                return 0
+
+            if args.jsonl:
+                write_jsonl(pages)
+                print(dumps_json({**poller.status, "pages": poller.received}), file=sys.stderr)
                 return 0
 
+            print(json.dumps({**poller.status, "data": list(pages)}, indent=2, ensure_ascii=False))
+            if checkpoint is not None:
+                # Pages are only durable once the whole document has been printed.
+                checkpoint.save(received=poller.received, status=poller.status.get("status"))
+            return 0
+
+        if args.subcommand == "batch-scrape":
+            urls = _read_url_arguments(args.urls, args.file)
+            if not urls:
+                print("Error: tidak ada URL untuk di-scrape", file=sys.stderr)
+                return 1
+            formats: list[str] = []
+            if args.markdown:
+                formats.append("markdown")
+            if args.html:
+                formats.append("html")
+            if args.screenshot:
+                formats.append("screenshot")
+            result = firecrawl_batch_scrape(urls, formats or ["markdown"], args.only_main, api_key)
             job_id = result.get("id")
             if not isinstance(job_id, str) or not job_id:
                 print(json.dumps(result, indent=2, ensure_ascii=False))
                 return 0
 
-            status = result
-            while status.get("status") not in {"completed", "failed", "cancelled"}:
-                time.sleep(max(1, args.poll_seconds))
-                status = firecrawl_check_crawl(job_id, api_key)
+            poller = FirecrawlJobPoller(
+                f"/batch/scrape/{job_id}",
+                api_key,
+                poll_seconds=args.poll_seconds,
+                max_poll_seconds=args.max_poll_seconds,
+            )
+            pages = poller.pages()
+            if index is not None:
+                pages = _index_pages(pages, index, source="batch-scrape")
+            if args.jsonl:
+                write_jsonl(pages)
+                print(dumps_json({**poller.status, "pages": poller.received}), file=sys.stderr)
+                return 0
 
-            print(json.dumps(status, indent=2, ensure_ascii=False))
+            print(json.dumps({**poller.status, "data": list(pages)}, indent=2, ensure_ascii=False))
             return 0
 
         if args.subcommand == "search-scrape":
-            results = search(
-                query=args.query,
-                search_type=args.search_type,
-                region=args.region,
-                timelimit=args.timelimit,
-                backend=args.backend,
-                max_results=args.max_results,
-            )
-            urls = []
+            with trace_span("search", search_type=args.search_type, backend=args.backend) as span:
+                results = search(
+                    query=args.query,
+                    search_type=args.search_type,
+                    region=args.region,
+                    timelimit=args.timelimit,
+                    backend=args.backend,
+                    max_results=args.max_results,
+                )
+                span["results"] = len(results)
+            unique: dict[str, dict[str, Any]] = {}
             for item in results:
                 url = get_result_url(item)
-                if url and url not in urls:
-                    urls.append(url)
-            urls = urls[: args.scrape_limit]
+                if url and url not in unique:
+                    unique[url] = item
+            alternates: dict[str, list[str]] = {}
+            if args.dedupe_similar:
+                clusters = cluster_near_duplicates(list(unique.values()), args.similarity_threshold)
+                urls = [get_result_url(cluster[0]) for cluster in clusters][: args.scrape_limit]
+                for representative, *others in clusters[: args.scrape_limit]:
+                    if others:
+                        alternates[get_result_url(representative)] = [get_result_url(item) for item in others]
+            else:
+                urls = list(unique)[: args.scrape_limit]
 
             formats: list[str] = []
             if args.markdown:
@@ -417,17 +3294,712 @@ def run_firecrawl(argv: list[str]) -> int:
                 formats.append("screenshot")
             formats = formats or ["markdown"]
 
-            scraped = [firecrawl_scrape(url, formats, True, api_key) for url in urls]
-            output = {"query": args.query, "urls": urls, "scraped": scraped}
+            scrape_options: dict[str, Any] = {
+                "concurrency": args.concurrency,
+                "cache": _scrape_cache_from_args(args),
+                "cache_ttl": args.cache_ttl,
+                "batch_threshold": args.batch_threshold,
+            }
+            if args.out_dir or args.jsonl:
+                # Each page is written out as soon as it arrives and then dropped, keeping memory flat.
+                spool = PageSpool(args.out_dir) if args.out_dir else None
+                counts = {"pages": 0, "errors": 0, "cache_hits": 0}
+                try:
+                    arrivals = iter_firecrawl_scrape_many(urls, formats, True, api_key, **scrape_options)
+                    for idx, item in arrivals:
+                        url = urls[idx]
+                        data = item.get("data")
+                        ok = item.get("success", True) and isinstance(data, dict)
+                        status = ("cached" if item.get("cache", {}).get("hit") else "ok") if ok else "error"
+                        counts["pages" if ok else "errors"] += 1
+                        counts["cache_hits"] += status == "cached"
+                        if ok and index is not None:
+                            index.upsert_page(data, url=url, source="search-scrape")
+                        if spool is None:
+                            write_jsonl([{"query": args.query, "rank": idx + 1, "url": url, **item}])
+                        elif ok:
+                            spool.write(data, query=args.query, rank=idx + 1, url=url, status=status)
+                        else:
+                            spool.record(
+                                query=args.query,
+                                rank=idx + 1,
+                                url=url,
+                                path=None,
+                                bytes=0,
+                                status=status,
+                                error=item.get("error"),
+                            )
+                finally:
+                    if spool is not None:
+                        spool.close()
+                summary: dict[str, Any] = {"query": args.query, "urls": urls, **counts}
+                if spool is not None:
+                    summary["out_dir"] = str(spool.out_dir)
+                if args.dedupe_similar:
+                    summary["alternates"] = alternates
+                if spool is None:
+                    print(dumps_json(summary), file=sys.stderr)
+                else:
+                    print(json.dumps(summary, indent=2, ensure_ascii=False))
+                return 0
+
+            scraped = firecrawl_scrape_many(urls, formats, True, api_key, **scrape_options)
+            if index is not None:
+                for url, item in zip(urls, scraped):
+                    if item.get("success", True) and isinstance(item.get("data"), dict):
+                        index.upsert_page(item["data"], url=url, source="search-scrape")
+            cache_hits = sum(1 for item in scraped if item.get("cache", {}).get("hit"))
+            output = {"query": args.query, "urls": urls, "scraped": scraped, "cache_hits": cache_hits}
+            if args.dedupe_similar:
+                output["alternates"] = alternates
             print(json.dumps(output, indent=2, ensure_ascii=False))
             return 0
     except ValueError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
+    finally:
+        if index is not None:
+            index.prune()
+            index.close()
 
     return 2
 
 
+def parse_verify(raw: str) -> bool | str:
+    value = raw.strip().lower()
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    return raw
+
+
+def parse_query_spec(spec: Any) -> dict[str, Any]:
+    if not isinstance(spec, dict):
+        raise ValueError("Query harus berupa object JSON")
+
+    spec = dict(spec)
+    if "type" in spec:
+        spec["search_type"] = spec.pop("type")
+    query = spec.pop("query", None)
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("Field 'query' wajib diisi")
+    record_id = spec.pop("id", None)
+    expand_url = spec.pop("expand_url", None)
+    unknown = sorted(set(spec) - BATCH_QUERY_OPTIONS)
+    if unknown:
+        raise ValueError(f"Opsi tidak dikenal: {','.join(unknown)}")
+
+    parsed: dict[str, Any] = {"query": query, "options": spec}
+    if record_id is not None:
+        parsed["id"] = record_id
+    if expand_url is not None:
+        parsed["expand_url"] = bool(expand_url)
+    return parsed
+
+
+def parse_batch_line(line: str) -> dict[str, Any]:
+    text = line.strip()
+    if not text.startswith("{"):
+        return {"query": text}
+
+    try:
+        spec = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"JSON tidak valid: {exc.msg}") from exc
+    return parse_query_spec(spec)
+
+
+def run_query_spec(
+    spec: dict[str, Any],
+    *,
+    defaults: dict[str, Any],
+    search_fn: SearchFn,
+    pool: DDGSSessionPool,
+    expand_url: bool = False,
+    redirect_cache: RedirectCache | None = None,
+) -> list[dict[str, Any]]:
+    options = {**defaults, **spec.get("options", {})}
+    query, search_type, region, timelimit = prepare_query_defaults(
+        query=spec["query"],
+        search_type=options["search_type"],
+        region=options["region"],
+        timelimit=options["timelimit"],
+    )
+    options.update(search_type=search_type, region=region, timelimit=timelimit)
+    with pool.checkout() as ddgs:
+        results = search_fn(query=query, **options, **pool.options, client=ddgs)
+    if spec.get("expand_url", expand_url):
+        results = with_resolved_urls(results, cache=redirect_cache)
+    return results
+
+
+def run_batch(argv: list[str], search_fn: SearchFn = search) -> int:
+    parser = argparse.ArgumentParser(description="Jalankan banyak query sekaligus (JSONL)")
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default="-",
+        help="File query (teks atau JSONL), '-' untuk stdin",
+    )
+    parser.add_argument(
+        "--type",
+        dest="search_type",
+        default="text",
+        choices=["text", "images", "videos", "news", "books"],
+    )
+    parser.add_argument("--region", default="us-en")
+    parser.add_argument("--safesearch", default="moderate", choices=["on", "moderate", "off"])
+    parser.add_argument("--timelimit", choices=["d", "w", "m", "y"])
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Jumlah query paralel")
+    parser.add_argument("--expand-url", action="store_true")
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--refresh", action="store_true")
+    parser.add_argument("--proxy")
+    parser.add_argument("--timeout", type=int, default=5)
+    parser.add_argument("--verify", default="true")
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return int(exc.code)
+
+    try:
+        source = sys.stdin if args.source == "-" else open(args.source, encoding="utf-8")  # noqa: SIM115
+    except OSError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    redirect_cache: RedirectCache | None = None
+    if (args.cache or args.refresh or cache_enabled_by_env()) and not args.no_cache:
+        search_fn = cached_search(search_fn, SearchCache(), refresh=args.refresh)
+        redirect_cache = RedirectCache()
+
+    defaults: dict[str, Any] = {
+        "search_type": args.search_type,
+        "region": args.region,
+        "safesearch": args.safesearch,
+        "timelimit": args.timelimit,
+        "max_results": args.max_results,
+        "backend": args.backend,
+    }
+    pool = DDGSSessionPool(proxy=args.proxy, timeout=args.timeout, verify=parse_verify(args.verify))
+    write_lock = threading.Lock()
+
+    def emit(record: dict[str, Any]) -> None:
+        line = dumps_json(record)
+        with write_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def run_one(index: int, line: str) -> dict[str, Any]:
+        record: dict[str, Any] = {"index": index, "query": line.strip()}
+        try:
+            spec = parse_batch_line(line)
+            record["query"] = spec["query"]
+            if "id" in spec:
+                record["id"] = spec["id"]
+            results = run_query_spec(
+                spec,
+                defaults=defaults,
+                search_fn=search_fn,
+                pool=pool,
+                expand_url=args.expand_url,
+                redirect_cache=redirect_cache,
+            )
+            record["results"] = results
+        except Exception as exc:  # noqa: BLE001
+            record["error"] = str(exc) or exc.__class__.__name__
+        return record
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    workers = max(1, args.concurrency)
+    pending: set[Future[dict[str, Any]]] = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="duckse-batch") as executor:
+            index = 0
+            for line in source:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                pending.add(executor.submit(run_one, index, line))
+                index += 1
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(future.result())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+    finally:
+        pool.close()
+        if source is not sys.stdin:
+            source.close()
+    return 0
+
+
+class DuckseService:
+    def __init__(
+        self,
+        *,
+        search_fn: SearchFn = search,
+        pool: DDGSSessionPool | None = None,
+        defaults: dict[str, Any] | None = None,
+        redirect_cache: RedirectCache | None = None,
+    ) -> None:
+        self.search_fn = search_fn
+        self.pool = pool or DDGSSessionPool()
+        self.defaults = {**SEARCH_DEFAULTS, **(defaults or {})}
+        self.redirect_cache = redirect_cache
+
+    def handle(self, method: str, path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        route = urlparse(path).path.rstrip("/") or "/"
+        if method == "GET" and route == "/health":
+            return {"status": "ok"}
+        if method != "POST":
+            raise LookupError(f"Route tidak ditemukan: {method} {route}")
+
+        if route == "/search":
+            spec = parse_query_spec(payload)
+            results = run_query_spec(
+                spec,
+                defaults=self.defaults,
+                search_fn=self.search_fn,
+                pool=self.pool,
+                redirect_cache=self.redirect_cache,
+            )
+            return {"query": spec["query"], "results": results}
+
+        if route == "/expand-url":
+            if isinstance(payload.get("results"), list):
+                return {"results": with_resolved_urls(payload["results"], cache=self.redirect_cache)}
+            urls = payload.get("urls")
+            if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                raise ValueError("Field 'urls' harus berupa list URL")
+            return {"resolved": resolve_urls(urls, cache=self.redirect_cache)}
+
+        if route.startswith("/firecrawl/"):
+            return self._handle_firecrawl(route.removeprefix("/firecrawl"), payload)
+
+        raise LookupError(f"Route tidak ditemukan: {method} {route}")
+
+    def _handle_firecrawl(self, route: str, payload: dict[str, Any]) -> dict[str, Any]:
+        api_key = _firecrawl_api_key()
+        if route == "/search":
+            return firecrawl_search(
+                _require_str(payload, "query"),
+                _optional_int(payload, "limit", 10),
+                _optional_str(payload, "lang", "en"),
+                _optional_str(payload, "country", "us"),
+                api_key,
+            )
+        if route == "/scrape":
+            formats = payload.get("formats") or ["markdown"]
+            if not isinstance(formats, list) or not all(isinstance(item, str) for item in formats):
+                raise ValueError("Field 'formats' harus berupa list string")
+            only_main = payload.get("only_main", True)
+            if not isinstance(only_main, bool):
+                raise ValueError("Field 'only_main' harus boolean")
+            return firecrawl_scrape(_require_str(payload, "url"), formats, only_main, api_key)
+        if route == "/crawl":
+            return firecrawl_start_crawl(
+                _require_str(payload, "url"),
+                _optional_int(payload, "max_pages", 50),
+                api_key,
+            )
+        if route == "/crawl/status":
+            return firecrawl_check_crawl(_require_str(payload, "id"), api_key)
+        raise LookupError(f"Route tidak ditemukan: POST /firecrawl{route}")
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def _require_str(payload: dict[str, Any], key: str) -> str:
+    value = payload.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"Field '{key}' wajib diisi")
+    return value
+
+
+def _optional_str(payload: dict[str, Any], key: str, default: str) -> str:
+    value = payload.get(key, default)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"Field '{key}' harus berupa string")
+    return value
+
+
+def _optional_int(payload: dict[str, Any], key: str, default: int) -> int:
+    value = payload.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"Field '{key}' harus integer positif")
+    return value
+
+
+def make_server(
+    service: DuckseService,
+    *,
+    host: str = SERVE_HOST,
+    port: int = SERVE_PORT,
+    unix_path: str | None = None,
+) -> Any:
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, status: int, body: dict[str, Any]) -> None:
+            data = dumps_json(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self) -> None:
+            payload: Any = {}
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                self._respond(400, {"error": "Header Content-Length tidak valid"})
+                return
+            if length > SERVE_MAX_BODY_BYTES:
+                self.close_connection = True
+                self._respond(413, {"error": "Request terlalu besar"})
+                return
+            if length:
+                try:
+                    payload = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self._respond(400, {"error": "Body harus JSON"})
+                    return
+            if not isinstance(payload, dict):
+                self._respond(400, {"error": "Body harus berupa object JSON"})
+                return
+
+            try:
+                body = service.handle(self.command, self.path, payload)
+            except LookupError as exc:
+                self._respond(404, {"error": str(exc)})
+            except ValueError as exc:
+                self._respond(400, {"error": str(exc)})
+            except Exception as exc:  # noqa: BLE001
+                self._respond(502, {"error": str(exc) or exc.__class__.__name__})
+            else:
+                self._respond(200, body)
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    if unix_path is None:
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        return server
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if _is_unix_socket(unix_path):
+        os.unlink(unix_path)
+    elif os.path.lexists(unix_path):
+        raise ValueError(f"{unix_path} sudah ada dan bukan Unix socket")
+    return UnixHTTPServer(unix_path, Handler)
+
+
+def _is_unix_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+# Bounded seen-set of two Bloom filter generations: once the current one holds `capacity` keys it becomes
+# the previous one and the oldest is dropped, so memory stays fixed and stale keys expire.
+class RotatingBloomFilter:
+    def __init__(
+        self, capacity: int = WATCH_SEEN_CAPACITY, error_rate: float = WATCH_SEEN_ERROR_RATE
+    ) -> None:
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("Kapasitas seen-set harus >= 1 dan error rate di antara 0 dan 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.current = bytearray((self.size + 7) // 8)
+        self.previous = bytearray(len(self.current))
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + idx * second) % self.size for idx in range(self.hashes)]
+
+    @staticmethod
+    def _has(bits: bytearray, positions: list[int]) -> bool:
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        return self._has(self.current, positions) or self._has(self.previous, positions)
+
+    def add(self, key: str) -> bool:
+        positions = self._positions(key)
+        if self._has(self.current, positions):
+            return False
+        # Keys still showing up are carried into the current generation so rotation does not resurface them.
+        seen = self._has(self.previous, positions)
+        if self.count >= self.capacity:
+            self.previous, self.current = self.current, bytearray(len(self.current))
+            self.count = 0
+        for pos in positions:
+            self.current[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        return not seen
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        capacity: int = WATCH_SEEN_CAPACITY,
+        error_rate: float = WATCH_SEEN_ERROR_RATE,
+    ) -> RotatingBloomFilter:
+        try:
+            raw = Path(path).read_bytes()
+        except FileNotFoundError:
+            return cls(capacity, error_rate)
+        except OSError as exc:
+            raise ValueError(f"State watch tidak bisa dibaca: {exc}") from exc
+        header, _, bits = raw.partition(b"\n")
+        try:
+            meta = json.loads(header)
+            seen = cls(int(meta["capacity"]), float(meta["error_rate"]))
+            seen.count = int(meta["count"])
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"State watch tidak valid: {path}") from exc
+        if len(bits) != 2 * len(seen.current):
+            raise ValueError(f"State watch tidak valid: {path}")
+        seen.current[:] = bits[: len(seen.current)]
+        seen.previous[:] = bits[len(seen.current) :]
+        return seen
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"capacity": self.capacity, "error_rate": self.error_rate, "count": self.count}
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(json.dumps(meta).encode() + b"\n" + bytes(self.current) + bytes(self.previous))
+        os.replace(tmp_path, path)
+
+
+def run_watch(
+    argv: list[str],
+    search_fn: SearchFn = search,
+    sleep: Callable[[float], None] | None = None,
+) -> int:
+    parser = argparse.ArgumentParser(description="Jalankan query berulang dan tulis hanya hasil baru (JSONL)")
+    parser.add_argument("queries", nargs="*", help="Query yang dipantau")
+    parser.add_argument("--file", help="File query (teks atau JSONL seperti duckse batch), '-' untuk stdin")
+    parser.add_argument(
+        "--type",
+        dest="search_type",
+        default="text",
+        choices=["text", "images", "videos", "news", "books"],
+    )
+    parser.add_argument("--region", default="us-en")
+    parser.add_argument("--safesearch", default="moderate", choices=["on", "moderate", "off"])
+    parser.add_argument("--timelimit", choices=["d", "w", "m", "y"])
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL_SECONDS,
+        help="Jeda antar putaran (detik)",
+    )
+    parser.add_argument("--iterations", type=int, default=0, help="Jumlah putaran (0 = terus berjalan)")
+    parser.add_argument("--once", action="store_true", help="Satu putaran saja (untuk cron)")
+    parser.add_argument("--state", help="File seen-set (default: watch.bloom di direktori cache)")
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=WATCH_SEEN_CAPACITY,
+        help="URL per generasi seen-set; hanya dipakai saat file state dibuat",
+    )
+    parser.add_argument("--expand-url", action="store_true")
+    parser.add_argument("--scrape", action="store_true", help="Scrape URL baru via Firecrawl (markdown)")
+    parser.add_argument("--concurrency", type=int, default=SCRAPE_CONCURRENCY)
+    parser.add_argument("--proxy")
+    parser.add_argument("--timeout", type=int, default=5)
+    parser.add_argument("--verify", default="true")
+
+    try:
+        args = parser.parse_args(argv)
+        if args.interval < 0:
+            parser.error("--interval tidak boleh negatif")
+    except SystemExit as exc:
+        return int(exc.code)
+
+    try:
+        lines = list(args.queries)
+        if args.file:
+            source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")  # noqa: SIM115
+            with source:
+                lines.extend(line for line in source if line.strip() and not line.lstrip().startswith("#"))
+        specs = [parse_batch_line(line) for line in lines]
+        if not specs:
+            raise ValueError("Berikan minimal satu query atau --file")
+        api_key = _firecrawl_api_key() if args.scrape else ""
+        state_path = Path(args.state) if args.state else duckse_cache_dir() / "watch.bloom"
+        seen = RotatingBloomFilter.load(state_path, capacity=args.capacity)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    defaults: dict[str, Any] = {
+        "search_type": args.search_type,
+        "region": args.region,
+        "safesearch": args.safesearch,
+        "timelimit": args.timelimit,
+        "max_results": args.max_results,
+        "backend": args.backend,
+    }
+    pool = DDGSSessionPool(proxy=args.proxy, timeout=args.timeout, verify=parse_verify(args.verify))
+    iterations = 1 if args.once else args.iterations
+    sleep = sleep or time.sleep
+    cycle = 0
+    try:
+        while True:
+            cycle += 1
+            counts = {"cycle": cycle, "results": 0, "new": 0, "errors": 0}
+            fresh: list[tuple[str, dict[str, Any]]] = []
+            cycle_keys: set[str] = set()
+            for spec in specs:
+                try:
+                    results = run_query_spec(
+                        spec, defaults=defaults, search_fn=search_fn, pool=pool, expand_url=args.expand_url
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    counts["errors"] += 1
+                    print(f"Error [{spec['query']}]: {exc}", file=sys.stderr)
+                    continue
+                counts["results"] += len(results)
+                for item in results:
+                    key = _result_key(item)
+                    if key is None or key in cycle_keys:
+                        continue
+                    cycle_keys.add(key)
+                    if key in seen:
+                        # Refreshes keys that only the older generation still remembers.
+                        seen.add(key)
+                        continue
+                    record = {"query": spec["query"], "url": get_result_url(item), **item}
+                    if "id" in spec:
+                        record["id"] = spec["id"]
+                    fresh.append((key, record))
+            counts["new"] = len(fresh)
+
+            # Only unseen results go downstream, so scraping scales with new items rather than total results.
+            if args.scrape:
+                pending: dict[str, tuple[str, dict[str, Any]]] = {}
+                for key, record in fresh:
+                    if record["url"]:
+                        pending[record["url"]] = (key, record)
+                    else:
+                        write_jsonl([record])
+                        seen.add(key)
+                urls = list(pending)
+                try:
+                    arrivals = iter_firecrawl_scrape_many(
+                        urls,
+                        ["markdown"],
+                        True,
+                        api_key,
+                        concurrency=args.concurrency,
+                        batch_threshold=SCRAPE_BATCH_THRESHOLD,
+                    )
+                    for idx, result in arrivals:
+                        key, record = pending.pop(urls[idx])
+                        write_jsonl([{**record, "scrape": result}])
+                        # Failed scrapes stay unseen so the next cycle tries them again.
+                        if result.get("success", True) and isinstance(result.get("data"), dict):
+                            seen.add(key)
+                except ValueError as exc:
+                    counts["errors"] += 1
+                    failed = {"success": False, "error": str(exc)}
+                    write_jsonl({**record, "scrape": failed} for _, record in pending.values())
+            else:
+                for key, record in fresh:
+                    write_jsonl([record])
+                    seen.add(key)
+            seen.save(state_path)
+            print(dumps_json(counts), file=sys.stderr)
+
+            if iterations and cycle >= iterations:
+                return 0
+            sleep(args.interval)
+    except KeyboardInterrupt:
+        # The seen-set is only saved after a full cycle, so an interrupted cycle is replayed next time.
+        return 0
+    finally:
+        pool.close()
+
+
+def run_serve(argv: list[str], search_fn: SearchFn = search) -> int:
+    parser = argparse.ArgumentParser(description="Jalankan duckse sebagai service HTTP lokal")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--unix", dest="unix_path", help="Listen di Unix socket ini, bukan TCP")
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--proxy")
+    parser.add_argument("--timeout", type=int, default=5)
+    parser.add_argument("--verify", default="true")
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return int(exc.code)
+
+    redirect_cache: RedirectCache | None = None
+    if (args.cache or cache_enabled_by_env()) and not args.no_cache:
+        search_fn = cached_search(search_fn, SearchCache())
+        redirect_cache = RedirectCache()
+
+    pool = DDGSSessionPool(proxy=args.proxy, timeout=args.timeout, verify=parse_verify(args.verify))
+    service = DuckseService(search_fn=search_fn, pool=pool, redirect_cache=redirect_cache)
+    try:
+        server = make_server(service, host=args.host, port=args.port, unix_path=args.unix_path)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    address = args.unix_path or f"http://{args.host}:{server.server_address[1]}"
+    print(f"duckse serve listening on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        firecrawl_client().close()
+        if args.unix_path and _is_unix_socket(args.unix_path):
+            os.unlink(args.unix_path)
+    return 0
+
+
 def run(
     argv: list[str] | None = None,
     search_fn: SearchFn = search,
@@ -437,6 +4009,20 @@ def run(
         argv = sys.argv[1:]
     if argv and argv[0] == "firecrawl":
         return firecrawl_run_fn(argv[1:])
+    if argv and argv[0] == "batch":
+        return run_batch(argv[1:], search_fn=search_fn)
+    if argv and argv[0] == "backends":
+        return run_backends(argv[1:])
+    if argv and argv[0] == "serve":
+        return run_serve(argv[1:], search_fn=search_fn)
+    if argv and argv[0] == "watch":
+        return run_watch(argv[1:], search_fn=search_fn)
+    if argv and argv[0] == "intent":
+        return run_intent(argv[1:])
+    if argv and argv[0] == "local":
+        return run_local(argv[1:])
+    if argv and argv[0] == "index":
+        return run_index(argv[1:])
 
     parser = argparse.ArgumentParser(description="DDGS metasearch CLI")
     parser.add_argument("query", help="Kata kunci pencarian")
@@ -457,7 +4043,32 @@ def run(
     parser.add_argument("--timelimit", choices=["d", "w", "m", "y"], help="Batas waktu")
     parser.add_argument("--max-results", type=int, default=10, help="Jumlah hasil")
     parser.add_argument("--page", type=int, default=1, help="Halaman hasil")
+    parser.add_argument(
+        "--all-pages",
+        action="store_true",
+        help="Ambil halaman berikutnya sampai habis (halaman berikut di-prefetch di background)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Total hasil maksimum lintas halaman (mengaktifkan --all-pages)",
+    )
     parser.add_argument("--backend", default="auto", help="Backend tunggal atau koma")
+    parser.add_argument(
+        "--fanout",
+        action="store_true",
+        help="Query tiap backend paralel lalu gabungkan peringkat (reciprocal rank fusion)",
+    )
+    parser.add_argument(
+        "--first-n",
+        type=int,
+        help="Dengan fan-out: kembalikan hasil begitu N hasil unik terkumpul",
+    )
+    parser.add_argument(
+        "--adaptive-backend",
+        action="store_true",
+        help="Catat kesehatan backend dan arahkan --backend auto ke backend tercepat yang sehat",
+    )
 
     parser.add_argument("--size", help="Filter image size")
     parser.add_argument("--color", help="Filter image color")
@@ -469,7 +4080,27 @@ def run(
     parser.add_argument("--duration", help="Filter video duration")
     parser.add_argument("--license-videos", help="Filter video license")
     parser.add_argument("--expand-url", action="store_true", help="Resolve URL final")
+    parser.add_argument(
+        "--expand-workers",
+        type=int,
+        default=EXPAND_MAX_WORKERS,
+        help="Jumlah worker paralel untuk --expand-url",
+    )
+    parser.add_argument(
+        "--expand-budget",
+        type=float,
+        default=EXPAND_BUDGET_SECONDS,
+        help="Batas total waktu --expand-url dalam detik",
+    )
     parser.add_argument("--json", action="store_true", help="Output JSON mentah")
+    parser.add_argument(
+        "--output",
+        choices=["pretty", "json", "jsonl"],
+        help="Format output: pretty, json (ringkas), atau jsonl (streaming per hasil)",
+    )
+    parser.add_argument("--cache", action="store_true", help="Pakai cache lokal hasil search")
+    parser.add_argument("--no-cache", action="store_true", help="Matikan cache walau DUCKSE_CACHE=1")
+    parser.add_argument("--refresh", action="store_true", help="Abaikan cache lalu simpan hasil baru")
     parser.add_argument("--proxy", help="Proxy http/https/socks5")
     parser.add_argument("--timeout", type=int, default=5, help="HTTP timeout dalam detik")
     parser.add_argument(
@@ -477,55 +4108,90 @@ def run(
         default="true",
         help="TLS verify: true, false, atau path PEM",
     )
+    _add_trace_arguments(parser)
 
+    started = time.perf_counter()
     args = parser.parse_args(argv)
-    query, search_type, region, timelimit = prepare_query_defaults(
-        query=args.query,
-        search_type=args.search_type,
-        region=args.region,
-        timelimit=args.timelimit,
-    )
-
-    verify: bool | str
-    verify_raw = args.verify.strip().lower()
-    if verify_raw == "true":
-        verify = True
-    elif verify_raw == "false":
-        verify = False
-    else:
-        verify = args.verify
+    with tracing(timings=args.timings, trace_file=args.trace_file, origin=started):
+        return _run_search(parser, args, search_fn)
 
-    try:
-        results = search_fn(
-            query=query,
-            search_type=search_type,
-            region=region,
-            safesearch=args.safesearch,
-            timelimit=timelimit,
-            max_results=args.max_results,
-            page=args.page,
-            backend=args.backend,
-            size=args.size,
-            color=args.color,
-            type_image=args.type_image,
-            layout=args.layout,
-            license_image=args.license_image,
-            resolution=args.resolution,
-            duration=args.duration,
-            license_videos=args.license_videos,
-            proxy=args.proxy,
-            timeout=args.timeout,
-            verify=verify,
+
+def _run_search(parser: argparse.ArgumentParser, args: argparse.Namespace, search_fn: SearchFn) -> int:
+    with trace_span("prepare_query_defaults") as span:
+        try:
+            intent = explain_query_defaults(
+                query=args.query,
+                search_type=args.search_type,
+                region=args.region,
+                timelimit=args.timelimit,
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+        span["rule"] = intent["rule"]
+    query, search_type = intent["query"], intent["type"]
+    region, timelimit = intent["region"], intent["timelimit"]
+
+    verify = parse_verify(args.verify)
+
+    if args.adaptive_backend or adaptive_backend_enabled_by_env():
+        search_fn = adaptive_search(
+            search_fn, BackendStats(), first_n=args.first_n, fanout=bool(args.fanout or args.first_n)
         )
+    elif args.fanout or args.first_n:
+        search_fn = fanout_search(search_fn, first_n=args.first_n)
+    redirect_cache: RedirectCache | None = None
+    if (args.cache or args.refresh or cache_enabled_by_env()) and not args.no_cache:
+        search_fn = cached_search(search_fn, SearchCache(), refresh=args.refresh)
+        redirect_cache = RedirectCache()
+
+    options: dict[str, Any] = {
+        "query": query,
+        "search_type": search_type,
+        "region": region,
+        "safesearch": args.safesearch,
+        "timelimit": timelimit,
+        "max_results": args.max_results,
+        "page": args.page,
+        "backend": args.backend,
+        "size": args.size,
+        "color": args.color,
+        "type_image": args.type_image,
+        "layout": args.layout,
+        "license_image": args.license_image,
+        "resolution": args.resolution,
+        "duration": args.duration,
+        "license_videos": args.license_videos,
+        "proxy": args.proxy,
+        "timeout": args.timeout,
+        "verify": verify,
+    }
+    output = args.output or ("json" if args.json else "pretty")
+    try:
+        records: Iterable[dict[str, Any]]
+        if args.all_pages or args.limit:
+            # Pages stream through iter_search; errors surface while rendering.
+            records = iter_search(search_fn=search_fn, limit=args.limit, **options)
+        else:
+            with trace_span("search", search_type=search_type, backend=args.backend) as span:
+                records = search_fn(**options)
+                span["results"] = len(records)
+        if args.expand_url:
+            records = iter_resolved_urls(
+                list(records),
+                max_workers=args.expand_workers,
+                budget=args.expand_budget,
+                cache=redirect_cache,
+            )
+
+        with trace_span("render", output=output) as span:
+            if output == "jsonl":
+                span["records"] = write_jsonl(records)
+            elif output == "json":
+                print(dumps_json(list(records), indent=args.output is None))
+            else:
+                print(render_pretty(list(records), search_type))
     except ValueError as exc:
         parser.error(str(exc))
-    if args.expand_url:
-        results = with_resolved_urls(results)
-
-    if args.json:
-        print(json.dumps(results, indent=2, ensure_ascii=False))
-    else:
-        print(render_pretty(results, search_type))
     return 0
 
 